@@ -1,4 +1,4 @@
 #!/bin/bash
 export PYTHONPATH=./vendor
-python3 manage.py migrate --noinput
-python3 -m gunicorn --workers 2 kojin_kouki_app.wsgi --bind 0.0.0.0:8000
\ No newline at end of file
+# マイグレーションは release.sh で適用済みのため、ここでは gunicorn だけを起動する
+exec python3 -m gunicorn -c gunicorn.conf.py kojin_kouki_app.wsgi
\ No newline at end of file
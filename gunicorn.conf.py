@@ -0,0 +1,7 @@
+import os
+
+bind = "0.0.0.0:8000"
+workers = int(os.environ.get("WEB_CONCURRENCY") or "2")
+
+# マスタープロセスでアプリを読み込んでから fork し、各ワーカーでの import を省く
+preload_app = True
@@ -12,13 +12,16 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 import os
 from pathlib import Path
-from dotenv import load_dotenv
-
-load_dotenv()
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# 本番（App Runner）では環境変数で渡すため、.env がある開発環境でのみ読み込む
+if (BASE_DIR / ".env").exists():
+    from dotenv import load_dotenv
+
+    load_dotenv(BASE_DIR / ".env")
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
@@ -35,8 +38,10 @@ CSRF_TRUSTED_ORIGINS = (os.environ.get("CSRF_TRUSTED_ORIGINS") or "").split(",")
 
 # Application definition
 
+# 管理画面は ENABLE_ADMIN=true のときだけ読み込み、ワーカーの起動を軽くする
+ENABLE_ADMIN = os.environ.get("ENABLE_ADMIN") == "true"
+
 INSTALLED_APPS = [
-    "django.contrib.admin",
     "django.contrib.auth",
     "django.contrib.contenttypes",
     "django.contrib.sessions",
@@ -45,21 +50,29 @@ INSTALLED_APPS = [
     "kojin_kouki_kadai",
 ]
 
+if ENABLE_ADMIN:
+    INSTALLED_APPS.insert(0, "django.contrib.admin")
+
 MIDDLEWARE = [
+    # ヘルスチェックは DB や認証を通さずに応答する
+    "kojin_kouki_kadai.middleware.HealthCheckMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    # HTML の圧縮と ETag による 304 応答（静的ファイルは WhiteNoise が圧縮済み）
+    "kojin_kouki_kadai.middleware.CompressionMiddleware",
+    "django.middleware.http.ConditionalGetMiddleware",
+    # ビューが宣言したクエリ数・DB 時間の予算を超えたリクエストを検出する
+    "kojin_kouki_kadai.middleware.QueryBudgetMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
+    "kojin_kouki_kadai.middleware.AuditLogMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
 if (os.environ.get("ENABLE_BASIC_AUTH") or "false") == "true":
-    print(
-        f"Enable Basic Auth Middleware in settings.py {os.environ.get('ENABLE_BASIC_AUTH')}"
-    )
     MIDDLEWARE.append("basicauth.middleware.BasicAuthMiddleware")
     BASICAUTH_USERS = {
         os.environ.get("BASIC_AUTH_USERNAME"): os.environ.get("BASIC_AUTH_PASSWORD"),
@@ -111,6 +124,32 @@ DATABASES = {
     }
 }
 
+# クエリ予算を超えたときに例外を送出する（テストで有効にする。本番は警告ログのみ）
+QUERY_BUDGET_STRICT = (os.environ.get("QUERY_BUDGET_STRICT") or "false") == "true"
+
+# 読み取り専用レプリカ（任意）
+# DB_REPLICA_HOST を設定すると参照系リクエストをレプリカから読み取る
+DATABASE_REPLICA_HOST = os.environ.get("DB_REPLICA_HOST")
+REPLICA_STICKY_SECONDS = int(os.environ.get("DB_REPLICA_STICKY_SECONDS") or "5")
+
+if DATABASE_REPLICA_HOST:
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "HOST": DATABASE_REPLICA_HOST,
+        "PORT": os.environ.get("DB_REPLICA_PORT") or DATABASE_PORT,
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_ROUTERS = ["kojin_kouki_kadai.routers.PrimaryReplicaRouter"]
+    MIDDLEWARE.append("kojin_kouki_kadai.middleware.ReplicaRoutingMiddleware")
+
+
+# Authentication
+# https://docs.djangoproject.com/en/5.2/topics/auth/default/
+
+LOGIN_URL = "login"
+LOGIN_REDIRECT_URL = "index"
+LOGOUT_REDIRECT_URL = "login"
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -1,30 +1,157 @@
 from django.contrib import admin
-from .models import Lecture, Assignment, SubmissionRecord, Grading
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import F
+from django.utils.functional import cached_property
+from .archive import archive_term
+from .models import (
+    Course,
+    CourseMembership,
+    Term,
+    Lecture,
+    Assignment,
+    AssignmentRecurrence,
+    SubmissionRecord,
+    Grading,
+    DeadlineReminder,
+    MetricSnapshot,
+)
+
+
+class EstimatedCountPaginator(Paginator):
+    """MySQL ではフィルタ無しの件数を統計情報の推定値で返すページネータ
+
+    InnoDB の ``COUNT(*)`` は全行走査になるため、大きなテーブルでは
+    ``information_schema.TABLES.TABLE_ROWS`` の推定値を使う。
+    推定値が小さい場合やフィルタ付きの場合は正確な件数を数える。
+    """
+
+    estimate_threshold = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = self._estimated_count(queryset)
+            if estimate is not None and estimate >= self.estimate_threshold:
+                return estimate
+        return super().count
+
+    @staticmethod
+    def _estimated_count(queryset):
+        connection = connections[queryset.db]
+        if connection.vendor != "mysql":
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        return row[0] if row else None
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """大きなテーブル向けの共通設定（全件 COUNT を避ける）"""
+
+    # 選択チェックボックスの aria-label で行ごとに __str__ が呼ばれるため、
+    # サブクラスは __str__ が辿る FK を list_select_related に指定すること
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+class ArchivedRowsAdminMixin:
+    """アーカイブ済みの行も管理画面で表示・編集できるようにする
+
+    既定のマネージャ（``objects``）はアーカイブ済みの行を除くため、一覧・編集画面と
+    外部キーの選択肢を ``all_objects`` から読む。
+    """
+
+    def get_queryset(self, request):
+        queryset = self.model.all_objects.get_queryset()
+        ordering = self.get_ordering(request)
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        return queryset
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        related_model = db_field.remote_field.model
+        if "queryset" not in kwargs and hasattr(related_model, "all_objects"):
+            kwargs["queryset"] = related_model.all_objects.all()
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+
+@admin.register(Course)
+class CourseAdmin(admin.ModelAdmin):
+    list_display = ("name", "created_at")
+    search_fields = ("name",)
+
+
+@admin.register(Term)
+class TermAdmin(admin.ModelAdmin):
+    list_display = ("name", "starts_on", "ends_on", "archived_at")
+    readonly_fields = ("archived_at",)
+    actions = ["archive"]
+
+    @admin.action(description="選択した学期をアーカイブする")
+    def archive(self, request, queryset):
+        for term in queryset.filter(archived_at__isnull=True):
+            archived = archive_term(term)
+            self.message_user(
+                request, f"{term}: {archived}件の課題をアーカイブしました"
+            )
+
+
+@admin.register(CourseMembership)
+class CourseMembershipAdmin(admin.ModelAdmin):
+    list_display = ("user", "course", "role")
+    list_filter = ("role",)
+    list_select_related = ("user", "course")
+    search_fields = ("user__username", "course__name")
+    autocomplete_fields = ("user", "course")
 
 
 @admin.register(Lecture)
-class LectureAdmin(admin.ModelAdmin):
-    list_display = ("name", "instructor", "day_of_week", "start_time", "classroom")
-    list_filter = ("day_of_week", "created_at")
+class LectureAdmin(ArchivedRowsAdminMixin, admin.ModelAdmin):
+    list_display = (
+        "name",
+        "course",
+        "instructor",
+        "day_of_week",
+        "start_time",
+        "classroom",
+    )
+    list_filter = ("term", "archived", "day_of_week", "created_at")
+    list_select_related = ("course",)
+    autocomplete_fields = ("course",)
     search_fields = ("name", "instructor", "classroom")
     ordering = ("day_of_week", "start_time")
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if change and "course" in form.changed_data:
+            obj.sync_assignment_course()
+
 
 @admin.register(Assignment)
-class AssignmentAdmin(admin.ModelAdmin):
+class AssignmentAdmin(ArchivedRowsAdminMixin, LargeTableAdmin):
     list_display = (
         "title",
-        "lecture",
+        "lecture_name",
         "due_date",
         "priority",
         "status",
         "days_until_due",
     )
-    list_filter = ("status", "priority", "lecture", "due_date")
+    # 講義は全件のプルダウンになるためフィルタではなく検索で絞り込む
+    list_filter = ("status", "priority", "archived", "due_date")
+    list_select_related = ("lecture",)
     search_fields = ("title", "lecture__name")
+    autocomplete_fields = ("lecture", "owner")
     readonly_fields = ("created_at", "updated_at")
     fieldsets = (
-        ("基本情報", {"fields": ("lecture", "title", "description")}),
+        ("基本情報", {"fields": ("lecture", "owner", "title", "description")}),
         ("期限と優先度", {"fields": ("due_date", "priority")}),
         ("ステータス", {"fields": ("status",)}),
         (
@@ -33,18 +160,101 @@ class AssignmentAdmin(admin.ModelAdmin):
         ),
     )
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(lecture_name=F("lecture__name"))
+
+    @admin.display(description="講義", ordering="lecture_name")
+    def lecture_name(self, obj):
+        return obj.lecture_name
+
+    @admin.display(description="残り日数", ordering="due_date")
+    def days_until_due(self, obj):
+        return obj.days_until_due
+
+
+@admin.register(AssignmentRecurrence)
+class AssignmentRecurrenceAdmin(admin.ModelAdmin):
+    list_display = (
+        "title_template",
+        "lecture",
+        "starts_on",
+        "ends_on",
+        "interval_weeks",
+        "materialized_until",
+    )
+    list_select_related = ("lecture",)
+    autocomplete_fields = ("lecture", "owner")
+    search_fields = ("title_template", "lecture__name")
+    readonly_fields = ("materialized_until", "created_at")
+
 
 @admin.register(SubmissionRecord)
-class SubmissionRecordAdmin(admin.ModelAdmin):
-    list_display = ("assignment", "submitted_at")
+class SubmissionRecordAdmin(ArchivedRowsAdminMixin, LargeTableAdmin):
+    list_display = ("assignment_title", "lecture_name", "submitted_at")
     list_filter = ("submitted_at",)
+    list_select_related = ("assignment",)
     search_fields = ("assignment__title",)
+    autocomplete_fields = ("assignment",)
     readonly_fields = ("submitted_at",)
 
+    def get_queryset(self, request):
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(
+                assignment_title=F("assignment__title"),
+                lecture_name=F("assignment__lecture__name"),
+            )
+        )
+
+    @admin.display(description="課題", ordering="assignment_title")
+    def assignment_title(self, obj):
+        return obj.assignment_title
+
+    @admin.display(description="講義", ordering="lecture_name")
+    def lecture_name(self, obj):
+        return obj.lecture_name
+
 
 @admin.register(Grading)
-class GradingAdmin(admin.ModelAdmin):
-    list_display = ("submission", "grade", "graded_at")
+class GradingAdmin(ArchivedRowsAdminMixin, LargeTableAdmin):
+    list_display = ("assignment_title", "grade", "graded_at")
     list_filter = ("grade", "graded_at")
+    list_select_related = ("submission__assignment",)
     search_fields = ("submission__assignment__title",)
+    autocomplete_fields = ("submission",)
     readonly_fields = ("graded_at",)
+
+    def get_queryset(self, request):
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(assignment_title=F("submission__assignment__title"))
+        )
+
+    @admin.display(description="課題", ordering="assignment_title")
+    def assignment_title(self, obj):
+        return obj.assignment_title
+
+
+@admin.register(DeadlineReminder)
+class DeadlineReminderAdmin(LargeTableAdmin):
+    list_display = ("assignment", "threshold", "due_date", "created_at", "sent_at")
+    list_filter = ("threshold", "sent_at")
+    list_select_related = ("assignment__lecture",)
+    readonly_fields = ("created_at",)
+
+
+@admin.register(MetricSnapshot)
+class MetricSnapshotAdmin(LargeTableAdmin):
+    list_display = (
+        "date",
+        "course",
+        "period",
+        "pending_count",
+        "submitted_count",
+        "graded_count",
+        "average_grade",
+    )
+    list_filter = ("period", "date")
+    list_select_related = ("course",)
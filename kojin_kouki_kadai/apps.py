@@ -2,5 +2,12 @@ from django.apps import AppConfig
 
 
 class KojinKoukiKadaiConfig(AppConfig):
-    default_auto_field = 'django.db.models.BigAutoField'
-    name = 'kojin_kouki_kadai'
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "kojin_kouki_kadai"
+
+    def ready(self):
+        # 差分同期用の削除記録（墓標）を作成するシグナルを登録する
+        from . import sync  # noqa: F401
+
+        # 課題の保存時に MinHash シグネチャを更新するシグナルを登録する
+        from . import similarity  # noqa: F401
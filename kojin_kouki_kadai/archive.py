@@ -0,0 +1,76 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import (
+    Assignment,
+    Grading,
+    Lecture,
+    SubmissionRecord,
+    SyncTombstone,
+    Term,
+)
+
+# 学期の終了後、成績の修正などのためにアーカイブを待つ期間
+ARCHIVE_GRACE = timedelta(days=30)
+
+
+def archive_term(term, now=None):
+    """学期の講義と課題をアーカイブ済みにする
+
+    提出記録・採点は課題の ``archived`` で既定のマネージャから外れるため更新しない。
+    端末に同期済みの課題・提出記録・採点は墓標で削除させる。アーカイブした課題の数を返す。
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        lecture_ids = list(
+            Lecture.all_objects.filter(term=term, archived=False).values_list(
+                "pk", flat=True
+            )
+        )
+        assignments = Assignment.all_objects.filter(
+            lecture_id__in=lecture_ids, archived=False
+        )
+        hidden = [
+            ("assignment", assignments, ""),
+            (
+                "submissionrecord",
+                SubmissionRecord.all_objects.filter(assignment__in=assignments),
+                "assignment__",
+            ),
+            (
+                "grading",
+                Grading.all_objects.filter(submission__assignment__in=assignments),
+                "submission__assignment__",
+            ),
+        ]
+        SyncTombstone.objects.bulk_create(
+            [
+                SyncTombstone(
+                    model=model,
+                    object_id=pk,
+                    owner_id=owner_id,
+                    course_id=course_id,
+                    deleted_at=now,
+                )
+                for model, queryset, prefix in hidden
+                for pk, owner_id, course_id in queryset.values_list(
+                    "pk", f"{prefix}owner_id", f"{prefix}course_id"
+                )
+            ],
+            batch_size=1000,
+        )
+        archived = assignments.update(archived=True)
+        Lecture.all_objects.filter(pk__in=lecture_ids).update(archived=True)
+
+        term.archived_at = now
+        term.save(update_fields=["archived_at"])
+    return archived
+
+
+def archive_ended_terms(today=None, grace=ARCHIVE_GRACE):
+    """終了から猶予期間が過ぎた未アーカイブの学期をアーカイブする"""
+    today = today or timezone.localdate()
+    terms = Term.objects.filter(archived_at__isnull=True, ends_on__lt=today - grace)
+    return {term: archive_term(term) for term in terms}
@@ -0,0 +1,118 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import models
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+# 変更履歴を残す列（model_name -> フィールド名）
+AUDITED_FIELDS = {
+    "assignment": ("status",),
+    "grading": ("grade", "feedback"),
+}
+
+_pending = ContextVar("audit_pending", default=None)
+
+
+def _to_text(value):
+    return "" if value is None else str(value)
+
+
+def record_changes(instance, old_values):
+    """監査対象の列の変更を記録する
+
+    ``old_values`` は変更前の値（フィールド名 -> 値）。``collect_changes()`` の中では
+    バッファに積むだけで、ブロックを抜けるときにまとめて書き込む。
+    """
+    model_name = instance._meta.model_name
+    audited = AUDITED_FIELDS.get(model_name, ())
+    entries = []
+    for name, old in old_values.items():
+        new = getattr(instance, name)
+        if name in audited and _to_text(old) != _to_text(new):
+            entries.append(
+                {
+                    "model": model_name,
+                    "object_id": instance.pk,
+                    "field": name,
+                    "old_value": _to_text(old),
+                    "new_value": _to_text(new),
+                }
+            )
+
+    pending = _pending.get()
+    if pending is None:
+        write_changes(entries)
+    else:
+        pending.extend(entries)
+
+
+def write_changes(entries, changed_by=""):
+    """変更履歴を 1 回の bulk_create で書き込む"""
+    if not entries:
+        return
+    from .models import ChangeLog
+
+    ChangeLog.objects.bulk_create(
+        [ChangeLog(changed_by=changed_by, **entry) for entry in entries]
+    )
+
+
+def _snapshot(instance):
+    """監査対象の列のうち読み込み済みの値を控える（遅延読み込みの列は除く）"""
+    audited = AUDITED_FIELDS.get(instance._meta.model_name, ())
+    instance._audit_values = {
+        name: instance.__dict__[name] for name in audited if name in instance.__dict__
+    }
+
+
+class AuditedModel(models.Model):
+    """保存経路によらず監査対象の列の変更を記録するモデルの基底クラス
+
+    DB から読み込んだ時点の値を控えておき、post_save で比較する。
+    save() のほか、post_save を送る条件付き更新（``versioned_update()``）も対象になる。
+    """
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        _snapshot(instance)
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        _snapshot(self)
+
+
+@receiver(post_save)
+def record_saved_changes(sender, instance, created, raw=False, **kwargs):
+    if raw or not isinstance(instance, AuditedModel):
+        return
+    if created:
+        # 新規作成は既定値からの変更として記録する
+        old_values = {
+            name: instance._meta.get_field(name).get_default()
+            for name in AUDITED_FIELDS.get(sender._meta.model_name, ())
+        }
+    else:
+        # 読み込んでいない行（値を控えていない列）の変更前の値は分からないため記録しない
+        old_values = getattr(instance, "_audit_values", {})
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            old_values = {k: v for k, v in old_values.items() if k in update_fields}
+    record_changes(instance, old_values)
+    _snapshot(instance)
+
+
+@contextmanager
+def collect_changes():
+    """ブロック内で記録された変更をバッファし、そのリストを返す"""
+    pending = []
+    token = _pending.set(pending)
+    try:
+        yield pending
+    finally:
+        _pending.reset(token)
@@ -1,13 +1,39 @@
+from datetime import date
+
 from django import forms
-from .models import Lecture, Assignment, SubmissionRecord, Grading
+from .models import (
+    Course,
+    Term,
+    Lecture,
+    Assignment,
+    AssignmentRecurrence,
+    SubmissionRecord,
+    Grading,
+    member_course_ids,
+)
+from .schedule import room_conflicts
+
+
+class UserScopedFormMixin:
+    """ログインユーザーが選べる関連先だけを選択肢に出すフォーム用 Mixin"""
+
+    def __init__(self, *args, user=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if user is not None:
+            self.limit_choices(user)
+
+    def limit_choices(self, user):
+        """選択肢を絞り込む（絞り込む関連先が無いフォームでは何もしない）"""
 
 
-class LectureForm(forms.ModelForm):
+class LectureForm(UserScopedFormMixin, forms.ModelForm):
     """講義フォーム"""
 
     class Meta:
         model = Lecture
         fields = [
+            "course",
+            "term",
             "name",
             "instructor",
             "day_of_week",
@@ -16,6 +42,8 @@ class LectureForm(forms.ModelForm):
             "classroom",
         ]
         widgets = {
+            "course": forms.Select(attrs={"class": "form-control"}),
+            "term": forms.Select(attrs={"class": "form-control"}),
             "name": forms.TextInput(
                 attrs={"class": "form-control", "placeholder": "講義名"}
             ),
@@ -34,13 +62,88 @@ class LectureForm(forms.ModelForm):
             ),
         }
 
+    def clean(self):
+        cleaned_data = super().clean()
+        start_time = cleaned_data.get("start_time")
+        end_time = cleaned_data.get("end_time")
+        if start_time and end_time and end_time <= start_time:
+            self.add_error("end_time", "終了時刻は開始時刻より後にしてください")
+            return cleaned_data
+
+        day_of_week = cleaned_data.get("day_of_week")
+        if not (day_of_week and start_time and end_time):
+            return cleaned_data
+
+        # 教室の重なりは時間割の重複レポートと同じ方法で、コースをまたいで調べる。
+        # 他のコースの講義名は見せない
+        term = cleaned_data.get("term")
+        classroom = cleaned_data.get("classroom")
+        if classroom:
+            candidate = Lecture(
+                pk=self.instance.pk,
+                term=term,
+                day_of_week=day_of_week,
+                start_time=start_time,
+                end_time=end_time,
+                classroom=classroom,
+            )
+            if room_conflicts([candidate]):
+                self.add_error(
+                    "classroom", "この教室はその時間帯にすでに予約されています"
+                )
+
+        # コースの時間割の重なり（(course, day_of_week, start_time) インデックス）
+        course = cleaned_data.get("course")
+        if course:
+            same_course = (
+                Lecture.objects.filter(
+                    course=course,
+                    term=term,
+                    day_of_week=day_of_week,
+                    start_time__lt=end_time,
+                    end_time__gt=start_time,
+                )
+                .exclude(pk=self.instance.pk)
+                .exclude(classroom=classroom)
+                .order_by("start_time")
+            )
+            for lecture in same_course[:5]:
+                self.add_error(
+                    "start_time",
+                    f"同じ時間帯に「{lecture.name}」（{self.period(lecture)}）があります",
+                )
+        return cleaned_data
+
+    @staticmethod
+    def period(lecture):
+        return f"{lecture.start_time:%H:%M}-{lecture.end_time:%H:%M}"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["term"].queryset = Term.objects.filter(archived_at__isnull=True)
 
-class AssignmentForm(forms.ModelForm):
+    def limit_choices(self, user):
+        # 講義を登録・変更できるのは担当コースの先生のみ
+        if not user.is_superuser:
+            self.fields["course"].queryset = Course.objects.filter(
+                pk__in=member_course_ids(user, role="teacher")
+            )
+
+
+class AssignmentForm(UserScopedFormMixin, forms.ModelForm):
     """課題フォーム"""
 
     class Meta:
         model = Assignment
-        fields = ["lecture", "title", "description", "due_date", "priority", "status"]
+        fields = [
+            "lecture",
+            "title",
+            "description",
+            "due_date",
+            "priority",
+            "status",
+            "version",
+        ]
         widgets = {
             "lecture": forms.Select(attrs={"class": "form-control"}),
             "title": forms.TextInput(
@@ -54,15 +157,82 @@ class AssignmentForm(forms.ModelForm):
             ),
             "priority": forms.Select(attrs={"class": "form-control"}),
             "status": forms.Select(attrs={"class": "form-control"}),
+            "version": forms.HiddenInput(),
         }
 
+    def limit_choices(self, user):
+        self.fields["lecture"].queryset = Lecture.objects.visible_to(user)
+
 
-class SubmissionRecordForm(forms.ModelForm):
+class AssignmentRecurrenceForm(UserScopedFormMixin, forms.ModelForm):
+    """繰り返し課題フォーム"""
+
+    exception_dates = forms.CharField(
+        required=False,
+        label="休講日",
+        help_text="YYYY-MM-DD 形式で 1 行に 1 日ずつ入力してください",
+        widget=forms.Textarea(
+            attrs={"class": "form-control", "placeholder": "2026-05-04", "rows": 3}
+        ),
+    )
+
+    class Meta:
+        model = AssignmentRecurrence
+        fields = [
+            "lecture",
+            "title_template",
+            "description",
+            "priority",
+            "due_time",
+            "interval_weeks",
+            "starts_on",
+            "ends_on",
+            "exception_dates",
+        ]
+        widgets = {
+            "lecture": forms.Select(attrs={"class": "form-control"}),
+            "title_template": forms.TextInput(attrs={"class": "form-control"}),
+            "description": forms.Textarea(
+                attrs={"class": "form-control", "placeholder": "説明", "rows": 4}
+            ),
+            "priority": forms.Select(attrs={"class": "form-control"}),
+            "due_time": forms.TimeInput(
+                attrs={"class": "form-control", "type": "time"}
+            ),
+            "interval_weeks": forms.NumberInput(
+                attrs={"class": "form-control", "min": 1}
+            ),
+            "starts_on": forms.DateInput(
+                attrs={"class": "form-control", "type": "date"}
+            ),
+            "ends_on": forms.DateInput(attrs={"class": "form-control", "type": "date"}),
+        }
+
+    def clean_exception_dates(self):
+        exception_dates = []
+        for line in self.cleaned_data["exception_dates"].split():
+            try:
+                exception_dates.append(date.fromisoformat(line).isoformat())
+            except ValueError:
+                raise forms.ValidationError(f"日付の形式が正しくありません: {line}")
+        return sorted(set(exception_dates))
+
+    def clean_interval_weeks(self):
+        interval_weeks = self.cleaned_data["interval_weeks"]
+        if interval_weeks < 1:
+            raise forms.ValidationError("間隔は 1 週以上にしてください")
+        return interval_weeks
+
+    def limit_choices(self, user):
+        self.fields["lecture"].queryset = Lecture.objects.visible_to(user)
+
+
+class SubmissionRecordForm(UserScopedFormMixin, forms.ModelForm):
     """提出記録フォーム（学生用）"""
 
     class Meta:
         model = SubmissionRecord
-        fields = ["assignment", "submitted_at", "notes"]
+        fields = ["assignment", "submitted_at", "notes", "version"]
         widgets = {
             "assignment": forms.Select(attrs={"class": "form-control"}),
             "submitted_at": forms.DateTimeInput(
@@ -71,15 +241,22 @@ class SubmissionRecordForm(forms.ModelForm):
             "notes": forms.Textarea(
                 attrs={"class": "form-control", "placeholder": "備考", "rows": 3}
             ),
+            "version": forms.HiddenInput(),
         }
 
+    def limit_choices(self, user):
+        # 選択肢のラベル（__str__）が講義名を参照する
+        self.fields["assignment"].queryset = Assignment.objects.visible_to(
+            user
+        ).select_related("lecture")
+
 
 class GradingForm(forms.ModelForm):
     """採点記録フォーム（先生用）"""
 
     class Meta:
         model = Grading
-        fields = ["grade", "feedback"]
+        fields = ["grade", "feedback", "version"]
         widgets = {
             "grade": forms.NumberInput(
                 attrs={"class": "form-control", "placeholder": "成績（100点満点）"}
@@ -91,4 +268,5 @@ class GradingForm(forms.ModelForm):
                     "rows": 3,
                 }
             ),
+            "version": forms.HiddenInput(),
         }
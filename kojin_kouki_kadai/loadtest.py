@@ -0,0 +1,500 @@
+import asyncio
+import random
+import time
+from collections import defaultdict, namedtuple
+from datetime import timedelta
+from html.parser import HTMLParser
+from urllib.parse import urlencode, urlsplit
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import (
+    Assignment,
+    Course,
+    CourseMembership,
+    Grading,
+    Lecture,
+    SubmissionRecord,
+    SyncTombstone,
+)
+
+# 負荷試験データのコース名・ユーザー名の接頭辞・パスワード
+LOADTEST_COURSE = "loadtest"
+LOADTEST_PASSWORD = "loadtest-password"
+
+# --seed（既存データの削除を伴う）を --allow-remote なしで許可する DB のホスト名
+LOCAL_DATABASE_HOSTS = {"", "localhost", "127.0.0.1", "::1"}
+
+# 1 リクエスト（接続から応答の受信まで）の待ち時間の上限（秒）。
+# 応答しない接続が 1 つあっても計測全体が止まらないようにする
+REQUEST_TIMEOUT = 30
+
+# シナリオ名 -> 重み（--mix で上書きできる）
+DEFAULT_MIX = {
+    "index": 20,
+    "assignment_list": 30,
+    "assignment_detail": 20,
+    "lecture_detail": 10,
+    "submission": 12,
+    "grading": 8,
+}
+
+Sample = namedtuple("Sample", ["name", "status", "latency", "ok"])
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+
+
+def is_local_database(database):
+    """DATABASES の設定がローカルの DB（SQLite または localhost の DB）を指しているか"""
+    if database["ENGINE"].endswith("sqlite3"):
+        return True
+    return (database.get("HOST") or "") in LOCAL_DATABASE_HOSTS
+
+
+def seed_load_data(students=50, teachers=2, lectures=20, assignments=40, seed=0):
+    """負荷試験用のコース・利用者・講義・課題・提出記録・採点を生成する
+
+    assignments は学生 1 人あたりの課題数。既存の負荷試験データは作り直す。
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+
+    with transaction.atomic():
+        # 課題の削除で同期用の墓標が作られるため、コースより先に消しておく
+        Assignment.all_objects.filter(course__name=LOADTEST_COURSE).delete()
+        SyncTombstone.objects.filter(course__name=LOADTEST_COURSE).delete()
+        Course.objects.filter(name=LOADTEST_COURSE).delete()
+        User.objects.filter(username__startswith=f"{LOADTEST_COURSE}-").delete()
+
+        course = Course.objects.create(name=LOADTEST_COURSE)
+        password = make_password(LOADTEST_PASSWORD)
+        usernames = [f"{LOADTEST_COURSE}-student{i}" for i in range(students)] + [
+            f"{LOADTEST_COURSE}-teacher{i}" for i in range(teachers)
+        ]
+        User.objects.bulk_create(
+            [User(username=username, password=password) for username in usernames]
+        )
+        # MySQL の bulk_create は主キーを返さないため取り直す
+        users = list(User.objects.filter(username__in=usernames))
+        CourseMembership.objects.bulk_create(
+            [
+                CourseMembership(
+                    course=course,
+                    user=user,
+                    role="teacher" if "-teacher" in user.username else "student",
+                )
+                for user in users
+            ]
+        )
+
+        Lecture.objects.bulk_create(
+            [
+                Lecture(
+                    course=course,
+                    name=f"講義{i}",
+                    instructor=f"講師{i % 7}",
+                    day_of_week=DAYS[i % len(DAYS)],
+                    start_time=f"{9 + (i // len(DAYS)) % 5 * 2:02d}:00",
+                    end_time=f"{10 + (i // len(DAYS)) % 5 * 2:02d}:30",
+                    classroom=f"A{100 + i}",
+                )
+                for i in range(lectures)
+            ]
+        )
+        lecture_ids = list(
+            Lecture.objects.filter(course=course).values_list("pk", flat=True)
+        )
+
+        Assignment.objects.bulk_create(
+            [
+                Assignment(
+                    lecture_id=rng.choice(lecture_ids),
+                    course=course,
+                    owner=user,
+                    title=f"第{n + 1}回レポート",
+                    description="負荷試験用の課題です。" * rng.randint(1, 10),
+                    due_date=now + timedelta(hours=rng.randint(-720, 720)),
+                    priority=rng.choice(["high", "medium", "low"]),
+                    status=rng.choices(
+                        ["pending", "submitted", "graded"], weights=[5, 3, 2]
+                    )[0],
+                )
+                for user in users
+                if "-student" in user.username
+                for n in range(assignments)
+            ],
+            batch_size=1000,
+        )
+        done = Assignment.objects.filter(
+            course=course, status__in=["submitted", "graded"]
+        ).values_list("pk", "status")
+        SubmissionRecord.objects.bulk_create(
+            [
+                SubmissionRecord(
+                    assignment_id=pk, submitted_at=now, notes="提出しました"
+                )
+                for pk, _ in done
+            ],
+            batch_size=1000,
+        )
+        Grading.objects.bulk_create(
+            [
+                Grading(submission=submission, grade=rng.randint(40, 100))
+                for submission in SubmissionRecord.objects.filter(
+                    assignment__course=course, assignment__status="graded"
+                ).only("pk")
+            ],
+            batch_size=1000,
+        )
+    return course
+
+
+class Targets:
+    """シナリオが使う ID の一覧（提出・採点で使った ID は取り除く）"""
+
+    def __init__(self, course):
+        self.lectures = list(
+            Lecture.objects.filter(course=course).values_list("pk", flat=True)
+        )
+        self.students = defaultdict(lambda: {"assignments": [], "pending": []})
+        for username, pk, status in Assignment.objects.filter(
+            course=course
+        ).values_list("owner__username", "pk", "status"):
+            self.students[username]["assignments"].append(pk)
+            if status == "pending":
+                self.students[username]["pending"].append(pk)
+        self.students = dict(self.students)
+        self.teachers = list(
+            CourseMembership.objects.filter(course=course, role="teacher").values_list(
+                "user__username", flat=True
+            )
+        )
+        self.ungraded = list(
+            SubmissionRecord.objects.filter(
+                assignment__course=course, grading__isnull=True
+            ).values_list("pk", flat=True)
+        )
+
+
+class FormParser(HTMLParser):
+    """フォームの入力欄（CSRF トークンや version の hidden を含む）の初期値を集める"""
+
+    def __init__(self):
+        super().__init__()
+        self.fields = {}
+        self._select = None
+        self._textarea = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        name = attrs.get("name")
+        if tag == "input" and name:
+            if attrs.get("type") in ("checkbox", "radio") and "checked" not in attrs:
+                return
+            self.fields[name] = attrs.get("value") or ""
+        elif tag == "select" and name:
+            self._select = name
+        elif tag == "option" and self._select:
+            if "selected" in attrs or self._select not in self.fields:
+                self.fields[self._select] = attrs.get("value") or ""
+        elif tag == "textarea" and name:
+            self._textarea = name
+            self.fields[name] = ""
+
+    def handle_endtag(self, tag):
+        if tag == "select":
+            self._select = None
+        elif tag == "textarea":
+            self._textarea = None
+
+    def handle_data(self, data):
+        if self._textarea:
+            self.fields[self._textarea] += data
+
+
+def parse_form(html):
+    parser = FormParser()
+    parser.feed(html)
+    return parser.fields
+
+
+class Session:
+    """1 利用者分の Cookie を保持する asyncio の最小限の HTTP/1.1 クライアント
+
+    gunicorn の sync ワーカーは keep-alive に対応しないため、リクエストごとに接続する。
+    ``timeout`` 秒以内に応答が揃わないリクエストはエラー（ステータス 0）として記録する。
+    """
+
+    def __init__(self, base_url, samples, timeout=REQUEST_TIMEOUT):
+        url = urlsplit(base_url)
+        self.host = url.hostname
+        self.port = url.port or 80
+        self.samples = samples
+        self.timeout = timeout
+        self.cookies = {}
+
+    async def request(self, name, method, path, data=None):
+        body = urlencode(data).encode() if data is not None else b""
+        headers = [
+            f"{method} {path} HTTP/1.1",
+            f"Host: {self.host}:{self.port}",
+            "Connection: close",
+        ]
+        if self.cookies:
+            headers.append(
+                "Cookie: " + "; ".join(f"{k}={v}" for k, v in self.cookies.items())
+            )
+        if data is not None:
+            headers += [
+                "Content-Type: application/x-www-form-urlencoded",
+                f"Content-Length: {len(body)}",
+            ]
+
+        async def exchange():
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+            try:
+                writer.write(("\r\n".join(headers) + "\r\n\r\n").encode() + body)
+                await writer.drain()
+                return await reader.read()
+            finally:
+                writer.close()
+
+        start = time.perf_counter()
+        try:
+            raw = await asyncio.wait_for(exchange(), self.timeout)
+            status, response_headers, content = parse_response(raw)
+        except (OSError, ValueError, asyncio.TimeoutError):
+            self.samples.append(
+                Sample(name, 0, (time.perf_counter() - start) * 1000, False)
+            )
+            return 0, ""
+        latency = (time.perf_counter() - start) * 1000
+
+        for header, value in response_headers:
+            if header == "set-cookie":
+                key, _, rest = value.partition("=")
+                self.cookies[key] = rest.split(";", 1)[0]
+        # POST の成功はリダイレクト（フォームの再表示は検証エラー）
+        ok = status == 302 if method == "POST" else status in (200, 304)
+        self.samples.append(Sample(name, status, latency, ok))
+        return status, content.decode("utf-8", "replace")
+
+    async def get(self, name, path):
+        return await self.request(name, "GET", path)
+
+    async def submit(self, name, path, values):
+        """フォームを取得し、初期値に values を重ねて POST する"""
+        status, html = await self.get(name, path)
+        if status != 200:
+            return status
+        status, _ = await self.request(
+            name, "POST", path, {**parse_form(html), **values}
+        )
+        return status
+
+    async def login(self, username):
+        return await self.submit(
+            "login",
+            reverse("login"),
+            {"username": username, "password": LOADTEST_PASSWORD},
+        )
+
+
+def parse_response(raw):
+    head, _, body = raw.partition(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split(" ", 2)[1])
+    headers = []
+    for line in lines[1:]:
+        key, _, value = line.partition(":")
+        headers.append((key.strip().lower(), value.strip()))
+    if ("transfer-encoding", "chunked") in headers:
+        body = dechunk(body)
+    return status, headers, body
+
+
+def dechunk(body):
+    chunks = []
+    while body:
+        size, _, body = body.partition(b"\r\n")
+        size = int(size.split(b";")[0], 16)
+        if size == 0:
+            break
+        chunks.append(body[:size])
+        body = body[size + 2 :]
+    return b"".join(chunks)
+
+
+# ===== シナリオ（実行できない場合は False を返し、代わりに一覧を開く）=====
+async def scenario_index(user, targets, rng):
+    await user.student.get("index", reverse("index"))
+
+
+async def scenario_assignment_list(user, targets, rng):
+    params = {}
+    if rng.random() < 0.5:
+        params["status"] = rng.choice(["pending", "submitted", "graded"])
+    if rng.random() < 0.3:
+        params["priority"] = rng.choice(["high", "medium", "low"])
+    if rng.random() < 0.3:
+        params["lecture"] = rng.choice(targets.lectures)
+    # 2 ページ目があるのはフィルタ無しで 1 ページ（20 件）を超える場合だけ
+    if not params and len(targets.students[user.username]["assignments"]) > 20:
+        if rng.random() < 0.2:
+            params["page"] = 2
+    query = f"?{urlencode(params)}" if params else ""
+    await user.student.get("assignment_list", reverse("assignment_list") + query)
+
+
+async def scenario_assignment_detail(user, targets, rng):
+    pk = rng.choice(targets.students[user.username]["assignments"])
+    await user.student.get("assignment_detail", reverse("assignment_detail", args=[pk]))
+
+
+async def scenario_lecture_detail(user, targets, rng):
+    pk = rng.choice(targets.lectures)
+    await user.student.get("lecture_detail", reverse("lecture_detail", args=[pk]))
+
+
+async def scenario_submission(user, targets, rng):
+    pending = targets.students[user.username]["pending"]
+    if not pending:
+        return False
+    pk = pending.pop()
+    await user.student.submit(
+        "submission",
+        reverse("submission_create", args=[pk]),
+        {"notes": "負荷試験から提出しました"},
+    )
+
+
+async def scenario_grading(user, targets, rng):
+    if not targets.ungraded:
+        return False
+    pk = targets.ungraded.pop()
+    await user.teacher.submit(
+        "grading",
+        reverse("grading_create", args=[pk]),
+        {"grade": rng.randint(40, 100), "feedback": "よくできています"},
+    )
+
+
+SCENARIOS = {
+    "index": scenario_index,
+    "assignment_list": scenario_assignment_list,
+    "assignment_detail": scenario_assignment_detail,
+    "lecture_detail": scenario_lecture_detail,
+    "submission": scenario_submission,
+    "grading": scenario_grading,
+}
+
+
+class VirtualUser:
+    """学生 1 人と、採点に使う先生 1 人のセッションの組"""
+
+    def __init__(self, base_url, username, teacher, samples, timeout=REQUEST_TIMEOUT):
+        self.username = username
+        self.teacher_name = teacher
+        self.student = Session(base_url, samples, timeout)
+        self.teacher = Session(base_url, samples, timeout)
+
+    async def login(self):
+        await self.student.login(self.username)
+        await self.teacher.login(self.teacher_name)
+
+
+async def run_stage(
+    base_url, targets, concurrency, duration, mix, seed=0, timeout=REQUEST_TIMEOUT
+):
+    """concurrency 人の仮想利用者で duration 秒間リクエストを送り、サンプルを返す
+
+    ログインは計測の前に済ませる。戻り値は (サンプルのリスト, 計測秒数)。
+    """
+    samples = []
+    students = sorted(targets.students)
+    users = [
+        VirtualUser(
+            base_url,
+            students[i % len(students)],
+            targets.teachers[i % len(targets.teachers)],
+            samples,
+            timeout,
+        )
+        for i in range(concurrency)
+    ]
+    await asyncio.gather(*(user.login() for user in users))
+    samples.clear()
+
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    deadline = time.perf_counter() + duration
+
+    async def worker(user, rng):
+        while time.perf_counter() < deadline:
+            scenario = SCENARIOS[rng.choices(names, weights)[0]]
+            if await scenario(user, targets, rng) is False:
+                await scenario_assignment_list(user, targets, rng)
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(worker(user, random.Random(seed + i)) for i, user in enumerate(users))
+    )
+    return samples, time.perf_counter() - start
+
+
+def percentile(values, p):
+    """ソート済みの values の p パーセンタイル（最近傍法）"""
+    if not values:
+        return 0.0
+    index = max(0, min(len(values) - 1, round(p / 100 * len(values)) - 1))
+    return values[index]
+
+
+def summarize(samples, elapsed):
+    """スループット（req/s）・レイテンシのパーセンタイル（ms）・エラー率"""
+    latencies = sorted(sample.latency for sample in samples)
+    errors = sum(not sample.ok for sample in samples)
+    return {
+        "requests": len(samples),
+        "throughput": len(samples) / elapsed if elapsed else 0.0,
+        "p50": percentile(latencies, 50),
+        "p90": percentile(latencies, 90),
+        "p99": percentile(latencies, 99),
+        "error_rate": errors / len(samples) if samples else 0.0,
+    }
+
+
+def summarize_by_name(samples, elapsed):
+    grouped = defaultdict(list)
+    for sample in samples:
+        grouped[sample.name].append(sample)
+    return {name: summarize(rows, elapsed) for name, rows in sorted(grouped.items())}
+
+
+def find_saturation(stages, min_gain=0.05):
+    """スループットの伸びが min_gain 未満になる直前の同時接続数
+
+    stages は (同時接続数, summarize の結果) のリスト。頭打ちにならなければ None。
+    """
+    best = None
+    for concurrency, summary in stages:
+        if best and summary["throughput"] < best[1] * (1 + min_gain):
+            return best[0]
+        if not best or summary["throughput"] > best[1]:
+            best = (concurrency, summary["throughput"])
+    return None
+
+
+def parse_mix(value):
+    """ "index=20,assignment_list=30" 形式のシナリオの重みを辞書にする"""
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        if name.strip() not in SCENARIOS:
+            raise ValueError(f"不明なシナリオです: {name}")
+        mix[name.strip()] = float(weight)
+    return mix
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from kojin_kouki_kadai.archive import archive_ended_terms, archive_term
+from kojin_kouki_kadai.models import Term
+
+
+class Command(BaseCommand):
+    help = "終了した学期の講義・課題をアーカイブする（cron から毎日実行）"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--term", type=int, help="指定した学期を終了日に関係なくアーカイブする"
+        )
+
+    def handle(self, *args, **options):
+        if options["term"]:
+            try:
+                term = Term.objects.get(pk=options["term"])
+            except Term.DoesNotExist:
+                raise CommandError(f"学期 {options['term']} は存在しません")
+            results = {term: archive_term(term)}
+        else:
+            results = archive_ended_terms()
+
+        for term, archived in results.items():
+            self.stdout.write(
+                self.style.SUCCESS(f"{term}: {archived}件の課題をアーカイブしました")
+            )
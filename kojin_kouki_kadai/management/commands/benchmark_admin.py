@@ -0,0 +1,50 @@
+import statistics
+import time
+
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from kojin_kouki_kadai.models import Assignment, SubmissionRecord, Grading
+
+
+class Command(BaseCommand):
+    help = "管理画面の一覧（changelist）の描画時間とクエリ数を計測する"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="計測回数（デフォルト: 5）"
+        )
+
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+        # DB に保存しないメモリ上のスーパーユーザーで権限チェックを通す
+        user = User(
+            username="benchmark", is_active=True, is_staff=True, is_superuser=True
+        )
+
+        for model in (Assignment, SubmissionRecord, Grading):
+            if not admin.site.is_registered(model):
+                raise CommandError(
+                    "管理画面が無効です（ENABLE_ADMIN=true で実行してください）"
+                )
+            model_admin = admin.site.get_model_admin(model)
+            timings = []
+            query_count = 0
+            for _ in range(options["repeat"]):
+                request = factory.get(f"/admin/{model._meta.app_label}/")
+                request.user = user
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    model_admin.changelist_view(request).render()
+                    timings.append((time.perf_counter() - start) * 1000)
+                query_count = len(queries)
+
+            self.stdout.write(
+                f"{model._meta.verbose_name}: "
+                f"中央値 {statistics.median(timings):.1f}ms / "
+                f"最大 {max(timings):.1f}ms / クエリ {query_count}件"
+            )
@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from kojin_kouki_kadai.models import Assignment
+from kojin_kouki_kadai.similarity import (
+    REPORT_THRESHOLD,
+    build_missing_signatures,
+    duplicate_groups,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "題名・説明がほぼ同じ課題のグループを一覧にする"
+        "（MinHash/LSH で同じバケットに入った課題だけを比較する）"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=REPORT_THRESHOLD,
+            help=f"重複とみなす類似度（デフォルト: {REPORT_THRESHOLD}）",
+        )
+        parser.add_argument("--course", type=int, help="対象のコース ID")
+        parser.add_argument(
+            "--no-archived", action="store_true", help="アーカイブ済みの課題を除く"
+        )
+
+    def handle(self, *args, **options):
+        if not 0 < options["threshold"] <= 1:
+            raise CommandError("--threshold は 0 より大きく 1 以下で指定してください")
+
+        manager = (
+            Assignment.objects if options["no_archived"] else Assignment.all_objects
+        )
+        queryset = manager.all()
+        if options["course"]:
+            queryset = queryset.filter(course_id=options["course"])
+
+        # bulk_create で作られた課題にはシグネチャが無いため、先に作っておく
+        built = build_missing_signatures(queryset)
+        if built:
+            self.stdout.write(f"シグネチャを {built} 件作成しました")
+
+        groups = duplicate_groups(queryset, threshold=options["threshold"])
+        assignments = manager.select_related("lecture").in_bulk(
+            [pk for group in groups for pk in group]
+        )
+        for group in groups:
+            self.stdout.write(f"\n{len(group)}件")
+            for pk in group:
+                assignment = assignments[pk]
+                self.stdout.write(
+                    f"  #{pk} {assignment.title}（{assignment.lecture.name}） "
+                    f"{assignment.due_date:%Y-%m-%d}"
+                )
+
+        duplicates = sum(len(group) - 1 for group in groups)
+        self.stdout.write(
+            f"\n重複グループ {len(groups)}件（重複している課題 {duplicates}件）"
+        )
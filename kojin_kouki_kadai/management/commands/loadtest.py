@@ -0,0 +1,192 @@
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from kojin_kouki_kadai.loadtest import (
+    DEFAULT_MIX,
+    LOADTEST_COURSE,
+    REQUEST_TIMEOUT,
+    Targets,
+    find_saturation,
+    is_local_database,
+    parse_mix,
+    run_stage,
+    seed_load_data,
+    summarize,
+    summarize_by_name,
+)
+from kojin_kouki_kadai.middleware import HEALTH_CHECK_PATH
+from kojin_kouki_kadai.models import Course
+
+
+class Command(BaseCommand):
+    help = (
+        "ローカルの gunicorn に実際のアクセス比率のリクエストを送り、"
+        "同時接続数ごとのスループット・レイテンシ・エラー率を計測する"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed",
+            action="store_true",
+            help="負荷試験データを作り直す（設定中の DB に書き込むためローカル専用）",
+        )
+        parser.add_argument(
+            "--allow-remote",
+            action="store_true",
+            help="ローカル以外の DB にも --seed で書き込む（本番の DB には使わないこと）",
+        )
+        parser.add_argument("--students", type=int, default=50, help="学生数")
+        parser.add_argument("--lectures", type=int, default=20, help="講義数")
+        parser.add_argument(
+            "--assignments", type=int, default=40, help="学生 1 人あたりの課題数"
+        )
+        parser.add_argument(
+            "--url", help="計測対象の URL（省略時は gunicorn を起動する）"
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=int(os.environ.get("WEB_CONCURRENCY") or "2"),
+            help="起動する gunicorn のワーカー数",
+        )
+        parser.add_argument(
+            "--concurrency",
+            default="1,2,4,8,16,32",
+            help="同時接続数の段階（カンマ区切り、デフォルト: 1,2,4,8,16,32）",
+        )
+        parser.add_argument(
+            "--duration", type=float, default=15, help="1 段階の計測秒数"
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=REQUEST_TIMEOUT,
+            help=f"1 リクエストの待ち時間の上限（秒、デフォルト: {REQUEST_TIMEOUT}）",
+        )
+        parser.add_argument(
+            "--mix",
+            default=",".join(f"{k}={v}" for k, v in DEFAULT_MIX.items()),
+            help="シナリオの重み（例: index=20,assignment_list=30,grading=8）",
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = options["verbosity"]
+        try:
+            mix = parse_mix(options["mix"])
+            levels = [int(level) for level in options["concurrency"].split(",")]
+        except ValueError as e:
+            raise CommandError(e)
+
+        if options["seed"]:
+            database = settings.DATABASES["default"]
+            if not (options["allow_remote"] or is_local_database(database)):
+                raise CommandError(
+                    "--seed は設定中の DB のデータを作り直すため、ローカルの DB でのみ"
+                    f"実行できます（HOST: {database.get('HOST')}）。"
+                    "それ以外の DB に書き込む場合は --allow-remote を付けてください"
+                )
+            self.stdout.write("負荷試験データを生成しています...")
+            course = seed_load_data(
+                students=options["students"],
+                lectures=options["lectures"],
+                assignments=options["assignments"],
+            )
+        else:
+            course = Course.objects.filter(name=LOADTEST_COURSE).first()
+            if course is None:
+                raise CommandError(
+                    "負荷試験データがありません。--seed を付けて実行してください"
+                )
+        targets = Targets(course)
+
+        server = None
+        base_url = options["url"]
+        if not base_url:
+            server, base_url = self.start_server(options["workers"])
+        try:
+            self.run_stages(
+                base_url, targets, levels, options["duration"], mix, options["timeout"]
+            )
+        finally:
+            if server:
+                server.terminate()
+                server.wait()
+
+    def start_server(self, workers):
+        """空きポートで gunicorn（本番と同じ gunicorn.conf.py）を起動する"""
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        server = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "gunicorn",
+                "-c",
+                "gunicorn.conf.py",
+                "--bind",
+                f"127.0.0.1:{port}",
+                "--workers",
+                str(workers),
+                "kojin_kouki_app.wsgi",
+            ],
+            cwd=settings.BASE_DIR,
+            env={**os.environ, "ALLOWED_HOSTS": "127.0.0.1"},
+        )
+        base_url = f"http://127.0.0.1:{port}"
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                urllib.request.urlopen(base_url + HEALTH_CHECK_PATH, timeout=1)
+                self.stdout.write(f"gunicorn（ワーカー {workers}）: {base_url}")
+                return server, base_url
+            except OSError:
+                if server.poll() is not None:
+                    raise CommandError("gunicorn の起動に失敗しました")
+                time.sleep(0.2)
+        server.terminate()
+        raise CommandError("gunicorn が 30 秒以内に応答しませんでした")
+
+    def run_stages(self, base_url, targets, levels, duration, mix, timeout):
+        self.stdout.write(
+            f"{'同時接続':>8} {'件数':>7} {'req/s':>8} "
+            f"{'p50':>8} {'p90':>8} {'p99':>8} {'エラー率':>8}"
+        )
+        stages = []
+        for concurrency in levels:
+            samples, elapsed = asyncio.run(
+                run_stage(
+                    base_url, targets, concurrency, duration, mix, timeout=timeout
+                )
+            )
+            summary = summarize(samples, elapsed)
+            stages.append((concurrency, summary))
+            self.stdout.write(
+                f"{concurrency:>8} {summary['requests']:>7} "
+                f"{summary['throughput']:>8.1f} {summary['p50']:>6.0f}ms "
+                f"{summary['p90']:>6.0f}ms {summary['p99']:>6.0f}ms "
+                f"{summary['error_rate']:>8.1%}"
+            )
+            if self.verbosity >= 2:
+                for name, row in summarize_by_name(samples, elapsed).items():
+                    self.stdout.write(
+                        f"    {name:<18} {row['requests']:>6}件 "
+                        f"p50 {row['p50']:.0f}ms / p99 {row['p99']:.0f}ms / "
+                        f"エラー率 {row['error_rate']:.1%}"
+                    )
+
+        saturation = find_saturation(stages)
+        if saturation is None:
+            self.stdout.write("\nスループットは最後の段階まで伸び続けました")
+        else:
+            self.stdout.write(
+                f"\n同時接続 {saturation} でスループットが頭打ちになりました"
+            )
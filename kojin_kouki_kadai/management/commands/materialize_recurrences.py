@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from kojin_kouki_kadai.recurrence import materialize_due
+
+
+class Command(BaseCommand):
+    help = "繰り返し課題を一定期間先まで課題として生成する（cron から毎日実行）"
+
+    def handle(self, *args, **options):
+        created = materialize_due()
+        self.stdout.write(self.style.SUCCESS(f"{created}件の課題を生成しました"))
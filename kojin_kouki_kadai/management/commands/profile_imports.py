@@ -0,0 +1,53 @@
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+
+# ワーカー起動時と同じく WSGI アプリケーションを読み込む
+BOOT_CODE = "import kojin_kouki_app.wsgi"
+
+
+class Command(BaseCommand):
+    help = (
+        "python -X importtime でワーカー起動時の import 時間を計測し、集計して表示する"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit", type=int, default=20, help="表示する件数（デフォルト: 20）"
+        )
+
+    def handle(self, *args, **options):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", BOOT_CODE],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+        # 各行は "import time: self [us] | cumulative | imported package"
+        modules = []
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "imported package" in line:
+                continue
+            self_us, cumulative_us, name = line[len("import time:") :].split("|")
+            modules.append((name.strip(), int(self_us), int(cumulative_us)))
+
+        packages = defaultdict(int)
+        for name, self_us, _ in modules:
+            packages[name.split(".")[0]] += self_us
+        total_us = sum(packages.values())
+
+        self.stdout.write(f"合計: {total_us / 1000:.1f}ms（{len(modules)}モジュール）")
+        self.stdout.write("\nパッケージ別（self 合計）")
+        for package, self_us in sorted(packages.items(), key=lambda i: -i[1])[
+            : options["limit"]
+        ]:
+            self.stdout.write(f"  {self_us / 1000:8.1f}ms  {package}")
+
+        self.stdout.write("\nモジュール別（cumulative）")
+        for name, _, cumulative_us in sorted(modules, key=lambda m: -m[2])[
+            : options["limit"]
+        ]:
+            self.stdout.write(f"  {cumulative_us / 1000:8.1f}ms  {name}")
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from kojin_kouki_kadai.sync import prune_tombstones
+
+
+class Command(BaseCommand):
+    help = "保持期間を過ぎた差分同期用の削除記録を削除する（cron から毎日実行）"
+
+    def handle(self, *args, **options):
+        deleted = prune_tombstones()
+        self.stdout.write(self.style.SUCCESS(f"{deleted}件の削除記録を削除しました"))
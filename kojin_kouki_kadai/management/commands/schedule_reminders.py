@@ -0,0 +1,31 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from kojin_kouki_kadai.reminders import scan_due_reminders, write_outbox_file
+
+
+class Command(BaseCommand):
+    help = "提出期限が近い未提出課題のリマインダーをアウトボックスに書き出す（cron から定期実行）"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lookback-hours",
+            type=int,
+            default=24,
+            help="初回実行時に遡る時間（デフォルト: 24）",
+        )
+        parser.add_argument(
+            "--outbox-file",
+            help="作成したリマインダーを JSON Lines で追記するファイル",
+        )
+
+    def handle(self, *args, **options):
+        reminders = scan_due_reminders(
+            lookback=timedelta(hours=options["lookback_hours"])
+        )
+        if options["outbox_file"]:
+            write_outbox_file(options["outbox_file"], reminders)
+        self.stdout.write(
+            self.style.SUCCESS(f"{len(reminders)}件のリマインダーを作成しました")
+        )
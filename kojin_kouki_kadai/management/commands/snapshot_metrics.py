@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from kojin_kouki_kadai.metrics import downsample, take_snapshot
+
+
+class Command(BaseCommand):
+    help = "ダッシュボード指標の日次スナップショットを保存し、古い行を週単位に間引く（cron から毎晩実行）"
+
+    def handle(self, *args, **options):
+        snapshots = take_snapshot()
+        dropped = downsample()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(snapshots)}件のスナップショットを保存し、{dropped}件を間引きました"
+            )
+        )
@@ -0,0 +1,125 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Avg, Count, F, Max, Q
+from django.db.models.functions import ExtractIsoYear, ExtractWeek
+from django.utils import timezone
+
+from .models import Assignment, Course, Grading, MetricSnapshot
+
+# これより古い日次スナップショットは週単位に間引く
+DAILY_RETENTION = timedelta(days=90)
+
+STATUS_FIELDS = {
+    "pending": "pending_count",
+    "submitted": "submitted_count",
+    "graded": "graded_count",
+}
+PRIORITY_FIELDS = {
+    "high": "high_count",
+    "medium": "medium_count",
+    "low": "low_count",
+}
+
+
+def take_snapshot(day=None):
+    """コースごとの現在の指標を集計し、day の日次スナップショットとして保存する
+
+    集計は GROUP BY のクエリで済ませ、同じ日に再実行した場合は置き換える。
+    """
+    day = day or timezone.localdate()
+    snapshots = defaultdict(lambda: MetricSnapshot(date=day))
+    # 課題が無くなったコースも 0 件として記録する
+    for course_id in Course.objects.values_list("pk", flat=True):
+        snapshots[course_id]
+
+    assignments = Assignment.objects.order_by()
+    for row in assignments.values("course_id", "status").annotate(n=Count("id")):
+        snapshot = snapshots[row["course_id"]]
+        setattr(snapshot, STATUS_FIELDS[row["status"]], row["n"])
+    for row in assignments.values("course_id", "priority").annotate(n=Count("id")):
+        snapshot = snapshots[row["course_id"]]
+        setattr(snapshot, PRIORITY_FIELDS[row["priority"]], row["n"])
+    for row in assignments.values("course_id", "lecture_id").annotate(n=Count("id")):
+        snapshots[row["course_id"]].lecture_counts[str(row["lecture_id"])] = row["n"]
+
+    grades = (
+        Grading.objects.order_by()
+        .values(course_id=F("submission__assignment__course_id"))
+        .annotate(n=Count("id"), average=Avg("grade"))
+    )
+    for row in grades:
+        snapshot = snapshots[row["course_id"]]
+        snapshot.grade_count = row["n"]
+        snapshot.average_grade = row["average"]
+
+    for course_id, snapshot in snapshots.items():
+        snapshot.course_id = course_id
+
+    with transaction.atomic():
+        MetricSnapshot.objects.filter(date=day, period="day").delete()
+        MetricSnapshot.objects.bulk_create(snapshots.values())
+    return list(snapshots.values())
+
+
+def downsample(today=None, retention=DAILY_RETENTION):
+    """保持期間より古い日次スナップショットを、コース・ISO 週ごとに最終日の 1 行へ間引く
+
+    件数や平均成績はその時点の値（ゲージ）なので、週の最後の値を週の代表とする。
+    保持期間の境界を含む週はまだ日次行が増えるため、境界より前に終わった週だけを
+    間引く。間引き済みの週次行も同じ週の行として数え、週ごとに 1 行にそろえる。
+    """
+    today = today or timezone.localdate()
+    cutoff = today - retention
+    old = MetricSnapshot.objects.filter(
+        date__lt=cutoff - timedelta(days=cutoff.weekday())
+    )
+    # 2 行以上残っているコース・週だけを GROUP BY で求める
+    weeks = (
+        old.order_by()
+        .values("course_id", year=ExtractIsoYear("date"), week=ExtractWeek("date"))
+        .annotate(n=Count("id"), last=Max("date"))
+        .filter(n__gt=1)
+    )
+    drop = Q(pk__in=[])
+    for row in weeks:
+        monday = row["last"] - timedelta(days=row["last"].weekday())
+        drop |= Q(course_id=row["course_id"], date__gte=monday, date__lt=row["last"])
+
+    with transaction.atomic():
+        dropped, _ = MetricSnapshot.objects.filter(drop).delete()
+        old.filter(period="day").update(period="week")
+    return dropped
+
+
+def trend_series(snapshots, lecture_id=None):
+    """スナップショットを日付ごとに合算し、グラフ用の系列にする
+
+    平均成績はコースごとの採点件数で重み付けして合算する。
+    """
+    count_fields = [*STATUS_FIELDS.values(), *PRIORITY_FIELDS.values()]
+    totals = defaultdict(
+        lambda: dict.fromkeys([*count_fields, "lecture", "graded", "grade_sum"], 0)
+    )
+    for row in snapshots.order_by("date").values():
+        point = totals[row["date"]]
+        for field in count_fields:
+            point[field] += row[field]
+        if lecture_id is not None:
+            point["lecture"] += row["lecture_counts"].get(str(lecture_id), 0)
+        if row["average_grade"] is not None:
+            point["graded"] += row["grade_count"]
+            point["grade_sum"] += row["average_grade"] * row["grade_count"]
+
+    points = list(totals.values())
+    series = {"labels": [day.isoformat() for day in totals]}
+    for field in count_fields:
+        series[field] = [point[field] for point in points]
+    if lecture_id is not None:
+        series["lecture_count"] = [point["lecture"] for point in points]
+    series["average_grade"] = [
+        round(point["grade_sum"] / point["graded"], 1) if point["graded"] else None
+        for point in points
+    ]
+    return series
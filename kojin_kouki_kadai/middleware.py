@@ -0,0 +1,197 @@
+import logging
+import re
+import secrets
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+from .audit import collect_changes, write_changes
+from .querybudget import QueryBudgetExceeded, QueryCounter, get_query_budget
+from .routers import read_from_replica
+
+try:
+    import brotli
+except ImportError:  # brotli が無い環境では gzip のみ
+    brotli = None
+
+# 書き込み直後のリクエストをプライマリに固定するための Cookie
+STICKY_COOKIE = "db_primary_sticky"
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+HEALTH_CHECK_PATH = "/healthz/"
+
+logger = logging.getLogger(__name__)
+
+
+class HealthCheckMiddleware:
+    """ヘルスチェックに DB・セッション・認証を通さずに応答する
+
+    MIDDLEWARE の先頭に置き、ホスト名の検証や Basic 認証より前に返す。
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.path == HEALTH_CHECK_PATH:
+            return HttpResponse("ok", content_type="text/plain")
+        return self.get_response(request)
+
+
+class ReplicaRoutingMiddleware:
+    """GET などの参照系リクエストをレプリカから読み取る
+
+    書き込み（POST など、または書き込みを伴った GET）を行ったユーザーには
+    ``REPLICA_STICKY_SECONDS`` 秒間 Cookie を付け、その間はプライマリから読む
+    （read-your-writes）。
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.method not in SAFE_METHODS:
+            return self.stick_to_primary(self.get_response(request))
+
+        if STICKY_COOKIE in request.COOKIES:
+            return self.get_response(request)
+
+        # TemplateResponse はこの中で描画されるため、テンプレート内の遅延評価も対象になる
+        with read_from_replica() as state:
+            response = self.get_response(request)
+        # GET でも書き込んだ場合（繰り返し課題の実体化など）は次のリクエストも固定する
+        if state["wrote"]:
+            self.stick_to_primary(response)
+        return response
+
+    @staticmethod
+    def stick_to_primary(response):
+        response.set_cookie(
+            STICKY_COOKIE,
+            "1",
+            max_age=settings.REPLICA_STICKY_SECONDS,
+            httponly=True,
+            samesite="Lax",
+        )
+        return response
+
+
+class AuditLogMiddleware:
+    """リクエスト中の変更履歴をバッファし、レスポンス生成後に一括で書き込む"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with collect_changes() as pending:
+            try:
+                return self.get_response(request)
+            finally:
+                # 変更が無いリクエストではユーザーを読み込まない
+                if pending:
+                    write_changes(pending, changed_by=self.get_actor(request))
+
+    @staticmethod
+    def get_actor(request):
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            return user.get_username()
+        # django-basicauth は認証したユーザー名を REMOTE_USER に入れる
+        return request.META.get("REMOTE_USER", "")
+
+
+ACCEPTS_BROTLI = re.compile(r"\bbr\b")
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """レスポンスを圧縮する（ブラウザが対応していれば Brotli、それ以外は gzip）"""
+
+    # 動的な HTML 向けに圧縮率より速度を優先する
+    brotli_quality = 5
+
+    def process_response(self, request, response):
+        if (
+            brotli is None
+            or response.streaming
+            or response.has_header("Content-Encoding")
+            or len(response.content) < 200
+            or not ACCEPTS_BROTLI.search(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        ):
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        compressed = self.compress_brotli(response.content)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response.headers["Content-Length"] = str(len(compressed))
+
+        # 圧縮後は強い ETag を弱い ETag にする（GZipMiddleware と同じ扱い）
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = "br"
+        return response
+
+    def compress_brotli(self, content):
+        """Brotli で圧縮し、BREACH 対策に乱数長の読み飛ばされるブロックを挟む
+
+        GZipMiddleware が gzip ヘッダーに乱数長のファイル名を入れるのと同じく、
+        圧縮後の長さから本文を推測されにくくする（``max_random_bytes`` は 256 以下）。
+        """
+        compressor = brotli.Compressor(quality=self.brotli_quality)
+        # flush() で出力をバイト境界にそろえてから、メタデータのメタブロックを置く
+        compressed = compressor.process(content) + compressor.flush()
+        padding = secrets.randbelow(self.max_random_bytes)
+        if padding:
+            # ISLAST=0, MNIBBLES=0（符号 0b11）, 予約 0, MSKIPBYTES=1, MSKIPLEN-1 の順に
+            # 下位ビットから詰め、残りの 2 ビットは 0 でバイト境界までうめる
+            skip = padding - 1
+            compressed += bytes([0b0110 | 1 << 4 | (skip & 0b11) << 6, skip >> 2])
+            compressed += b"a" * padding
+        return compressed + compressor.finish()
+
+
+class QueryBudgetMiddleware:
+    """ビューが宣言したクエリ予算を超えたリクエストを検出する
+
+    ``QUERY_BUDGET_STRICT`` が真（テスト時）なら ``QueryBudgetExceeded`` を送出し、
+    偽（本番）なら警告ログを出すだけにする。セッションや変更履歴の書き込みも
+    予算に含めるため、SessionMiddleware より外側に置く。
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        # TemplateResponse はビューを抜けた後、ここへ戻る前に描画されるため
+        # テンプレート内のクエリも数えられる
+        with QueryCounter() as counter:
+            response = self.get_response(request)
+
+        budget = getattr(request, "_query_budget", None)
+        if budget is not None:
+            self.check(request, budget, counter)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._query_budget = get_query_budget(view_func)
+
+    def check(self, request, budget, counter):
+        problems = []
+        if counter.queries > budget.queries:
+            problems.append(f"クエリ {counter.queries}件 > 予算 {budget.queries}件")
+        if counter.db_time > budget.db_time:
+            problems.append(
+                f"DB 時間 {counter.db_time:.1f}ms > 予算 {budget.db_time}ms"
+            )
+        if not problems:
+            return
+
+        message = f"{request.method} {request.path}: " + " / ".join(problems)
+        if settings.QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded(message)
+        logger.warning("クエリ予算超過 %s", message)
@@ -0,0 +1,110 @@
+# Generated by Django 5.2.10 on 2026-10-19 15:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("kojin_kouki_kadai", "0003_auto_20260210_1321"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DeadlineReminder",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "threshold",
+                    models.CharField(
+                        choices=[
+                            ("3d", "3日前"),
+                            ("1d", "1日前"),
+                            ("overdue", "期限超過"),
+                        ],
+                        max_length=10,
+                        verbose_name="通知タイミング",
+                    ),
+                ),
+                ("due_date", models.DateTimeField(verbose_name="通知時点の提出期限")),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="作成日時"),
+                ),
+                (
+                    "sent_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="送信日時"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "締切リマインダー",
+                "verbose_name_plural": "締切リマインダー",
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ReminderWatermark",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "threshold",
+                    models.CharField(
+                        choices=[
+                            ("3d", "3日前"),
+                            ("1d", "1日前"),
+                            ("overdue", "期限超過"),
+                        ],
+                        max_length=10,
+                        unique=True,
+                        verbose_name="通知タイミング",
+                    ),
+                ),
+                ("scanned_until", models.DateTimeField(verbose_name="走査済み時刻")),
+            ],
+            options={
+                "verbose_name": "リマインダー走査位置",
+                "verbose_name_plural": "リマインダー走査位置",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="assignment",
+            index=models.Index(
+                fields=["status", "due_date"], name="assignment_status_due_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="deadlinereminder",
+            name="assignment",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="reminders",
+                to="kojin_kouki_kadai.assignment",
+                verbose_name="課題",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="deadlinereminder",
+            constraint=models.UniqueConstraint(
+                fields=("assignment", "threshold"), name="unique_reminder_per_threshold"
+            ),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.10 on 2026-10-19 15:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("kojin_kouki_kadai", "0004_deadline_reminders"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="assignment",
+            name="version",
+            field=models.PositiveIntegerField(default=0, verbose_name="バージョン"),
+        ),
+        migrations.AddField(
+            model_name="grading",
+            name="version",
+            field=models.PositiveIntegerField(default=0, verbose_name="バージョン"),
+        ),
+        migrations.AddField(
+            model_name="submissionrecord",
+            name="version",
+            field=models.PositiveIntegerField(default=0, verbose_name="バージョン"),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.10 on 2026-10-19 16:00
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("kojin_kouki_kadai", "0005_row_versions"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChangeLog",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("model", models.CharField(max_length=50, verbose_name="対象モデル")),
+                ("object_id", models.BigIntegerField(verbose_name="対象ID")),
+                ("field", models.CharField(max_length=50, verbose_name="項目")),
+                ("old_value", models.TextField(blank=True, verbose_name="変更前")),
+                ("new_value", models.TextField(blank=True, verbose_name="変更後")),
+                (
+                    "changed_by",
+                    models.CharField(blank=True, max_length=150, verbose_name="変更者"),
+                ),
+                (
+                    "changed_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="変更日時"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "変更履歴",
+                "verbose_name_plural": "変更履歴",
+                "ordering": ["-changed_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["model", "object_id", "changed_at"],
+                        name="changelog_object_idx",
+                    ),
+                    models.Index(
+                        fields=["changed_at"], name="changelog_changed_at_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
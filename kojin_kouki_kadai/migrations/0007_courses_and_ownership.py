@@ -0,0 +1,147 @@
+# Generated by Django 5.2.10 on 2026-10-19 16:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("kojin_kouki_kadai", "0006_change_log"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Course",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100, verbose_name="コース名")),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="作成日時"),
+                ),
+            ],
+            options={
+                "verbose_name": "コース",
+                "verbose_name_plural": "コース",
+                "ordering": ["name"],
+            },
+        ),
+        migrations.CreateModel(
+            name="CourseMembership",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "role",
+                    models.CharField(
+                        choices=[("teacher", "先生"), ("student", "学生")],
+                        max_length=10,
+                        verbose_name="役割",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "コース所属",
+                "verbose_name_plural": "コース所属",
+            },
+        ),
+        migrations.AddField(
+            model_name="assignment",
+            name="owner",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="assignments",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="所有者",
+            ),
+        ),
+        migrations.AddField(
+            model_name="assignment",
+            name="course",
+            field=models.ForeignKey(
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="assignments",
+                to="kojin_kouki_kadai.course",
+                verbose_name="コース",
+            ),
+        ),
+        migrations.AddField(
+            model_name="lecture",
+            name="course",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="lectures",
+                to="kojin_kouki_kadai.course",
+                verbose_name="コース",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="assignment",
+            index=models.Index(
+                fields=["owner", "status", "due_date"],
+                name="assignment_owner_status_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="assignment",
+            index=models.Index(
+                fields=["course", "status", "due_date"],
+                name="assignment_course_status_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="lecture",
+            index=models.Index(
+                fields=["course", "day_of_week", "start_time"],
+                name="lecture_course_day_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="coursemembership",
+            name="course",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="memberships",
+                to="kojin_kouki_kadai.course",
+                verbose_name="コース",
+            ),
+        ),
+        migrations.AddField(
+            model_name="coursemembership",
+            name="user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="course_memberships",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="ユーザー",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="coursemembership",
+            constraint=models.UniqueConstraint(
+                fields=("user", "course"), name="unique_course_membership"
+            ),
+        ),
+    ]
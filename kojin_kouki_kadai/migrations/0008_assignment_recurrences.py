@@ -0,0 +1,129 @@
+# Generated by Django 5.2.10 on 2026-10-19 16:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("kojin_kouki_kadai", "0007_courses_and_ownership"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="assignment",
+            name="occurrence_number",
+            field=models.PositiveIntegerField(
+                blank=True, editable=False, null=True, verbose_name="週番号"
+            ),
+        ),
+        migrations.CreateModel(
+            name="AssignmentRecurrence",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "title_template",
+                    models.CharField(
+                        default="第{n}回レポート",
+                        help_text="{n} は回数に置き換わります",
+                        max_length=200,
+                        verbose_name="課題名",
+                    ),
+                ),
+                ("description", models.TextField(blank=True, verbose_name="説明")),
+                (
+                    "priority",
+                    models.CharField(
+                        choices=[("low", "低"), ("medium", "中"), ("high", "高")],
+                        default="medium",
+                        max_length=10,
+                        verbose_name="優先度",
+                    ),
+                ),
+                ("due_time", models.TimeField(verbose_name="提出期限の時刻")),
+                (
+                    "interval_weeks",
+                    models.PositiveSmallIntegerField(
+                        default=1, verbose_name="間隔（週）"
+                    ),
+                ),
+                ("starts_on", models.DateField(verbose_name="開始日")),
+                (
+                    "ends_on",
+                    models.DateField(blank=True, null=True, verbose_name="終了日"),
+                ),
+                (
+                    "exception_dates",
+                    models.JSONField(blank=True, default=list, verbose_name="休講日"),
+                ),
+                (
+                    "materialized_until",
+                    models.DateField(
+                        blank=True,
+                        editable=False,
+                        null=True,
+                        verbose_name="生成済みの日付",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="作成日時"),
+                ),
+                (
+                    "lecture",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="recurrences",
+                        to="kojin_kouki_kadai.lecture",
+                        verbose_name="講義",
+                    ),
+                ),
+                (
+                    "owner",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="assignment_recurrences",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="所有者",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "繰り返し課題",
+                "verbose_name_plural": "繰り返し課題",
+                "ordering": ["lecture", "starts_on"],
+            },
+        ),
+        migrations.AddField(
+            model_name="assignment",
+            name="recurrence",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="occurrences",
+                to="kojin_kouki_kadai.assignmentrecurrence",
+                verbose_name="繰り返しルール",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="assignment",
+            constraint=models.UniqueConstraint(
+                fields=("recurrence", "occurrence_number"),
+                name="unique_recurrence_occurrence",
+            ),
+        ),
+    ]
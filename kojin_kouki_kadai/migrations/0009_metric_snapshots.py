@@ -0,0 +1,97 @@
+# Generated by Django 5.2.10 on 2026-10-19 16:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("kojin_kouki_kadai", "0008_assignment_recurrences"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MetricSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(verbose_name="日付")),
+                (
+                    "period",
+                    models.CharField(
+                        choices=[("day", "日次"), ("week", "週次")],
+                        default="day",
+                        max_length=10,
+                        verbose_name="粒度",
+                    ),
+                ),
+                (
+                    "pending_count",
+                    models.PositiveIntegerField(default=0, verbose_name="未提出"),
+                ),
+                (
+                    "submitted_count",
+                    models.PositiveIntegerField(default=0, verbose_name="提出済み"),
+                ),
+                (
+                    "graded_count",
+                    models.PositiveIntegerField(default=0, verbose_name="採点済み"),
+                ),
+                (
+                    "high_count",
+                    models.PositiveIntegerField(default=0, verbose_name="優先度: 高"),
+                ),
+                (
+                    "medium_count",
+                    models.PositiveIntegerField(default=0, verbose_name="優先度: 中"),
+                ),
+                (
+                    "low_count",
+                    models.PositiveIntegerField(default=0, verbose_name="優先度: 低"),
+                ),
+                (
+                    "lecture_counts",
+                    models.JSONField(default=dict, verbose_name="講義別課題数"),
+                ),
+                (
+                    "grade_count",
+                    models.PositiveIntegerField(default=0, verbose_name="採点件数"),
+                ),
+                (
+                    "average_grade",
+                    models.FloatField(null=True, verbose_name="平均成績"),
+                ),
+                (
+                    "course",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="metric_snapshots",
+                        to="kojin_kouki_kadai.course",
+                        verbose_name="コース",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "指標スナップショット",
+                "verbose_name_plural": "指標スナップショット",
+                "ordering": ["date"],
+                "indexes": [
+                    models.Index(
+                        fields=["course", "date"], name="metric_course_date_idx"
+                    ),
+                    models.Index(
+                        fields=["period", "date"], name="metric_period_date_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 5.2.10 on 2026-10-19 16:19
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("kojin_kouki_kadai", "0009_metric_snapshots"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SyncTombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("model", models.CharField(max_length=50, verbose_name="対象モデル")),
+                ("object_id", models.BigIntegerField(verbose_name="対象ID")),
+                (
+                    "deleted_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="削除日時"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "削除記録",
+                "verbose_name_plural": "削除記録",
+                "ordering": ["deleted_at"],
+            },
+        ),
+        migrations.AddField(
+            model_name="submissionrecord",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, verbose_name="更新日時"),
+        ),
+        migrations.AddIndex(
+            model_name="assignment",
+            index=models.Index(fields=["updated_at"], name="assignment_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="grading",
+            index=models.Index(fields=["graded_at"], name="grading_graded_at_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="submissionrecord",
+            index=models.Index(fields=["updated_at"], name="submission_updated_idx"),
+        ),
+        migrations.AddField(
+            model_name="synctombstone",
+            name="course",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="kojin_kouki_kadai.course",
+                verbose_name="コース",
+            ),
+        ),
+        migrations.AddField(
+            model_name="synctombstone",
+            name="owner",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="所有者",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="synctombstone",
+            index=models.Index(fields=["deleted_at"], name="tombstone_deleted_at_idx"),
+        ),
+    ]
@@ -0,0 +1,95 @@
+# Generated by Django 5.2.10 on 2026-10-19 16:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("kojin_kouki_kadai", "0010_sync_tombstones"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Term",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100, verbose_name="学期名")),
+                ("starts_on", models.DateField(verbose_name="開始日")),
+                ("ends_on", models.DateField(verbose_name="終了日")),
+                (
+                    "archived_at",
+                    models.DateTimeField(
+                        blank=True,
+                        editable=False,
+                        null=True,
+                        verbose_name="アーカイブ日時",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "学期",
+                "verbose_name_plural": "学期",
+                "ordering": ["-starts_on"],
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name="assignment",
+            name="assignment_owner_status_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="assignment",
+            name="assignment_course_status_idx",
+        ),
+        migrations.AddField(
+            model_name="assignment",
+            name="archived",
+            field=models.BooleanField(
+                default=False, editable=False, verbose_name="アーカイブ済み"
+            ),
+        ),
+        migrations.AddField(
+            model_name="lecture",
+            name="archived",
+            field=models.BooleanField(
+                default=False, editable=False, verbose_name="アーカイブ済み"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="assignment",
+            index=models.Index(
+                fields=["owner", "archived", "status", "due_date"],
+                name="assignment_owner_status_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="assignment",
+            index=models.Index(
+                fields=["course", "archived", "status", "due_date"],
+                name="assignment_course_status_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="lecture",
+            name="term",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="lectures",
+                to="kojin_kouki_kadai.term",
+                verbose_name="学期",
+            ),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.10 on 2026-10-19 16:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("kojin_kouki_kadai", "0011_terms_and_archival"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AssignmentSignature",
+            fields=[
+                (
+                    "assignment",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="signature",
+                        serialize=False,
+                        to="kojin_kouki_kadai.assignment",
+                        verbose_name="課題",
+                    ),
+                ),
+                (
+                    "digest",
+                    models.CharField(max_length=32, verbose_name="本文のハッシュ"),
+                ),
+                ("minhash", models.JSONField(verbose_name="MinHash")),
+            ],
+            options={
+                "verbose_name": "課題のシグネチャ",
+                "verbose_name_plural": "課題のシグネチャ",
+            },
+        ),
+        migrations.CreateModel(
+            name="AssignmentSignatureBand",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("bucket", models.BigIntegerField(verbose_name="バケット")),
+                (
+                    "signature",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="bands",
+                        to="kojin_kouki_kadai.assignmentsignature",
+                        verbose_name="シグネチャ",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "LSH バケット",
+                "verbose_name_plural": "LSH バケット",
+                "indexes": [
+                    models.Index(
+                        fields=["bucket", "signature"], name="signature_band_bucket_idx"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.10 on 2026-10-19 16:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("kojin_kouki_kadai", "0012_assignment_signatures"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="lecture",
+            index=models.Index(
+                fields=["classroom", "day_of_week", "start_time"],
+                name="lecture_classroom_day_idx",
+            ),
+        ),
+    ]
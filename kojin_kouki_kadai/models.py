@@ -1,10 +1,280 @@
+from django.conf import settings
 from django.db import models
+from django.db.models import Avg, Case, Count, F, FloatField, Min, Q, When
+from django.db.models.signals import post_save
 from django.utils import timezone
 
+from .audit import AuditedModel
+
+
+class Course(models.Model):
+    """コース（クラス）モデル - データを分離する単位"""
+
+    name = models.CharField(max_length=100, verbose_name="コース名")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="作成日時")
+
+    class Meta:
+        verbose_name = "コース"
+        verbose_name_plural = "コース"
+        ordering = ["name"]
+
+    def __str__(self):
+        return self.name
+
+
+class Term(models.Model):
+    """学期 - 終了した学期はアーカイブして日常の一覧・集計から外す"""
+
+    name = models.CharField(max_length=100, verbose_name="学期名")
+    starts_on = models.DateField(verbose_name="開始日")
+    ends_on = models.DateField(verbose_name="終了日")
+    archived_at = models.DateTimeField(
+        null=True, blank=True, editable=False, verbose_name="アーカイブ日時"
+    )
+
+    class Meta:
+        verbose_name = "学期"
+        verbose_name_plural = "学期"
+        ordering = ["-starts_on"]
+
+    def __str__(self):
+        return self.name
+
+
+class CourseMembership(models.Model):
+    """コースの所属（先生／学生）"""
+
+    ROLE_CHOICES = [
+        ("teacher", "先生"),
+        ("student", "学生"),
+    ]
+
+    course = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        related_name="memberships",
+        verbose_name="コース",
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="course_memberships",
+        verbose_name="ユーザー",
+    )
+    role = models.CharField(max_length=10, choices=ROLE_CHOICES, verbose_name="役割")
+
+    class Meta:
+        verbose_name = "コース所属"
+        verbose_name_plural = "コース所属"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "course"], name="unique_course_membership"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.course} ({self.get_role_display()})"
+
+
+def member_course_ids(user, role=None):
+    """ユーザーが所属するコースの ID 一覧（リクエスト中はユーザーにキャッシュする）"""
+    cache = user.__dict__.setdefault("_course_ids", {})
+    if "memberships" not in cache:
+        cache["memberships"] = list(
+            CourseMembership.objects.filter(user=user).values_list("course_id", "role")
+        )
+    return [
+        course_id
+        for course_id, course_role in cache["memberships"]
+        if role is None or course_role == role
+    ]
+
+
+def versioned_update(instance, values, expected_version=None):
+    """version を 1 つ上げて ``values`` の列だけを UPDATE する
+
+    ``expected_version`` を指定すると ``WHERE version = ?`` の条件付き更新になり、
+    他のユーザーが先に更新していた場合は何もせず False を返す。
+    update() では post_save が送られないため、成功したら save() と同じく送る。
+    """
+    model = type(instance)
+    values = dict(values)
+    # update() では auto_now が働かないため明示的に更新する
+    for field in model._meta.concrete_fields:
+        if getattr(field, "auto_now", False):
+            values[field.name] = timezone.now()
+
+    queryset = model.objects.filter(pk=instance.pk)
+    if expected_version is not None:
+        queryset = queryset.filter(version=expected_version)
+    if not queryset.update(version=F("version") + 1, **values):
+        return False
+
+    for name, value in values.items():
+        setattr(instance, name, value)
+    if expected_version is not None:
+        instance.version = expected_version + 1
+    post_save.send(
+        sender=model,
+        instance=instance,
+        created=False,
+        update_fields=frozenset(values) | {"version"},
+        raw=False,
+        using=queryset.db,
+    )
+    return True
+
+
+class ActiveManager(models.Manager):
+    """アーカイブ済みの行を除く既定のマネージャ
+
+    除外に使う列は QuerySet の ``archived_field`` で指定する。
+    アーカイブ済みの行は ``all_objects`` から読む。
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        return queryset.filter(**{queryset.archived_field: False})
+
+
+class TenantQuerySet(models.QuerySet):
+    """ログインユーザーが見られる行に絞り込む QuerySet
+
+    学生は自分が所有する行、先生は担当コースの行を見られる。
+    ``owner_field`` / ``course_field`` は複合インデックスの先頭列に合わせてサブクラスで指定する。
+    """
+
+    owner_field = None
+    course_field = None
+
+    def visible_to(self, user):
+        return self.filter(self.visibility(user))
+
+    @classmethod
+    def visibility(cls, user, prefix=""):
+        """``visible_to`` の条件（prefix を付ければ関連先の集計の filter にも使える）"""
+        if user.is_superuser:
+            return Q()
+        owner_field = f"{prefix}{cls.owner_field}"
+        course_field = f"{prefix}{cls.course_field}__in"
+        teaching = member_course_ids(user, role="teacher")
+        if cls.owner_field is None:
+            return Q(**{course_field: member_course_ids(user)})
+        if not teaching:
+            return Q(**{owner_field: user})
+        # 先生は担当コースの行をすべて見られるので course の IN だけにする
+        # （所有者との OR にすると (course, ...) のインデックスが使えなくなる）。
+        # 学生としても所属していれば、そのコースの自分の行だけを足す
+        visible = Q(**{course_field: teaching})
+        learning = [pk for pk in member_course_ids(user) if pk not in teaching]
+        if learning:
+            visible |= Q(**{owner_field: user, course_field: learning})
+        return visible
+
+    def taught_by(self, user):
+        if user.is_superuser:
+            return self
+        return self.filter(
+            **{f"{self.course_field}__in": member_course_ids(user, role="teacher")}
+        )
+
+
+class LectureQuerySet(TenantQuerySet):
+    course_field = "course_id"
+    archived_field = "archived"
+
+    def with_stats(self, user):
+        """講義ごとの課題の集計を 1 本のクエリで付与する（user が見られる課題のみ）
+
+        assignment_count, completed_count, overdue_count, next_deadline,
+        average_grade, completion_rate（%）
+        """
+        now = timezone.now()
+        visible = AssignmentQuerySet.visibility(user, prefix="assignments__")
+        pending = visible & Q(assignments__status="pending")
+        return self.annotate(
+            assignment_count=Count("assignments", filter=visible),
+            completed_count=Count(
+                "assignments",
+                filter=visible & Q(assignments__status__in=["submitted", "graded"]),
+            ),
+            overdue_count=Count(
+                "assignments", filter=pending & Q(assignments__due_date__lt=now)
+            ),
+            next_deadline=Min(
+                "assignments__due_date",
+                filter=pending & Q(assignments__due_date__gte=now),
+            ),
+            average_grade=Avg(
+                "assignments__submission__grading__grade", filter=visible
+            ),
+        ).annotate(
+            completion_rate=Case(
+                When(assignment_count=0, then=None),
+                default=F("completed_count") * 100.0 / F("assignment_count"),
+                output_field=FloatField(),
+            )
+        )
+
+
+class AssignmentQuerySet(TenantQuerySet):
+    owner_field = "owner"
+    course_field = "course_id"
+    archived_field = "archived"
+
+
+class SubmissionRecordQuerySet(TenantQuerySet):
+    owner_field = "assignment__owner"
+    course_field = "assignment__course_id"
+    archived_field = "assignment__archived"
+
+
+class AssignmentRecurrenceQuerySet(TenantQuerySet):
+    owner_field = "owner"
+    course_field = "lecture__course_id"
+
+
+class SyncTombstoneQuerySet(TenantQuerySet):
+    owner_field = "owner"
+    course_field = "course_id"
+
+
+class MetricSnapshotQuerySet(TenantQuerySet):
+    course_field = "course_id"
+
+    @classmethod
+    def visibility(cls, user, prefix=""):
+        # コース全体の集計値のため、学生には見せず担当コースの先生だけが見られる
+        if user.is_superuser:
+            return Q()
+        course_ids = member_course_ids(user, role="teacher")
+        return Q(**{f"{prefix}{cls.course_field}__in": course_ids})
+
+
+class GradingQuerySet(TenantQuerySet):
+    owner_field = "submission__assignment__owner"
+    course_field = "submission__assignment__course_id"
+    archived_field = "submission__assignment__archived"
+
 
 class Lecture(models.Model):
     """講義モデル"""
 
+    course = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name="lectures",
+        verbose_name="コース",
+    )
+    term = models.ForeignKey(
+        Term,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="lectures",
+        verbose_name="学期",
+    )
     name = models.CharField(max_length=100, verbose_name="講義名")
     instructor = models.CharField(max_length=100, verbose_name="講師名")
     day_of_week = models.CharField(
@@ -23,19 +293,41 @@ class Lecture(models.Model):
     start_time = models.TimeField(verbose_name="開始時刻")
     end_time = models.TimeField(verbose_name="終了時刻")
     classroom = models.CharField(max_length=100, verbose_name="教室")
+    archived = models.BooleanField(
+        default=False, editable=False, verbose_name="アーカイブ済み"
+    )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="作成日時")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="更新日時")
 
+    objects = ActiveManager.from_queryset(LectureQuerySet)()
+    all_objects = LectureQuerySet.as_manager()
+
     class Meta:
         verbose_name = "講義"
         verbose_name_plural = "講義"
         ordering = ["day_of_week", "start_time"]
+        indexes = [
+            models.Index(
+                fields=["course", "day_of_week", "start_time"],
+                name="lecture_course_day_idx",
+            ),
+            models.Index(
+                fields=["classroom", "day_of_week", "start_time"],
+                name="lecture_classroom_day_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.day_of_week})"
 
+    def sync_assignment_course(self):
+        """課題に複製しているコースを講義のコースに揃える（アーカイブ済みの課題も含む）"""
+        return Assignment.all_objects.filter(lecture=self).update(
+            course=self.course_id, updated_at=timezone.now()
+        )
+
 
-class Assignment(models.Model):
+class Assignment(AuditedModel):
     """課題モデル"""
 
     PRIORITY_CHOICES = [
@@ -56,6 +348,35 @@ class Assignment(models.Model):
         related_name="assignments",
         verbose_name="講義",
     )
+    # 講義のコースを複製して持つ（コース先頭の複合インデックスで絞り込むため）
+    course = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        null=True,
+        editable=False,
+        related_name="assignments",
+        verbose_name="コース",
+    )
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name="assignments",
+        verbose_name="所有者",
+    )
+    # 繰り返しルールから生成された課題の場合のみ設定する
+    recurrence = models.ForeignKey(
+        "AssignmentRecurrence",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="occurrences",
+        verbose_name="繰り返しルール",
+    )
+    occurrence_number = models.PositiveIntegerField(
+        null=True, blank=True, editable=False, verbose_name="週番号"
+    )
     title = models.CharField(max_length=200, verbose_name="課題名")
     description = models.TextField(blank=True, verbose_name="説明")
     due_date = models.DateTimeField(verbose_name="提出期限")
@@ -68,17 +389,51 @@ class Assignment(models.Model):
         default="pending",
         verbose_name="ステータス",
     )
+    version = models.PositiveIntegerField(default=0, verbose_name="バージョン")
+    # 講義と同時にアーカイブする（アーカイブ済みの講義の課題は必ずアーカイブ済み）
+    archived = models.BooleanField(
+        default=False, editable=False, verbose_name="アーカイブ済み"
+    )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="作成日時")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="更新日時")
 
+    objects = ActiveManager.from_queryset(AssignmentQuerySet)()
+    all_objects = AssignmentQuerySet.as_manager()
+
     class Meta:
         verbose_name = "課題"
         verbose_name_plural = "課題"
         ordering = ["due_date"]
+        indexes = [
+            models.Index(
+                fields=["status", "due_date"], name="assignment_status_due_idx"
+            ),
+            # アーカイブ済みの行をテナント内で後ろにまとめ、日常の検索範囲に含めない
+            models.Index(
+                fields=["owner", "archived", "status", "due_date"],
+                name="assignment_owner_status_idx",
+            ),
+            models.Index(
+                fields=["course", "archived", "status", "due_date"],
+                name="assignment_course_status_idx",
+            ),
+            # 差分同期（updated_at 以降の変更）の範囲検索用
+            models.Index(fields=["updated_at"], name="assignment_updated_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["recurrence", "occurrence_number"],
+                name="unique_recurrence_occurrence",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.lecture.name})"
 
+    def save(self, *args, **kwargs):
+        self.course_id = self.lecture.course_id
+        super().save(*args, **kwargs)
+
     @property
     def is_overdue(self):
         """期限超過判定"""
@@ -90,6 +445,66 @@ class Assignment(models.Model):
         delta = self.due_date - timezone.now()
         return delta.days
 
+    def set_status(self, status):
+        """ステータス列だけを更新する（編集中のフォームは競合として検出される）"""
+        versioned_update(self, {"status": status})
+
+
+class AssignmentRecurrence(models.Model):
+    """課題の繰り返しルール（講義の曜日に毎週）
+
+    課題は ``materialized_until`` までだけ実体化し、それより先の回は
+    recurrence.py の ``occurrences_between()`` で計算して扱う。
+    """
+
+    lecture = models.ForeignKey(
+        Lecture,
+        on_delete=models.CASCADE,
+        related_name="recurrences",
+        verbose_name="講義",
+    )
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name="assignment_recurrences",
+        verbose_name="所有者",
+    )
+    title_template = models.CharField(
+        max_length=200,
+        default="第{n}回レポート",
+        verbose_name="課題名",
+        help_text="{n} は回数に置き換わります",
+    )
+    description = models.TextField(blank=True, verbose_name="説明")
+    priority = models.CharField(
+        max_length=10,
+        choices=Assignment.PRIORITY_CHOICES,
+        default="medium",
+        verbose_name="優先度",
+    )
+    due_time = models.TimeField(verbose_name="提出期限の時刻")
+    interval_weeks = models.PositiveSmallIntegerField(
+        default=1, verbose_name="間隔（週）"
+    )
+    starts_on = models.DateField(verbose_name="開始日")
+    ends_on = models.DateField(null=True, blank=True, verbose_name="終了日")
+    exception_dates = models.JSONField(default=list, blank=True, verbose_name="休講日")
+    materialized_until = models.DateField(
+        null=True, blank=True, editable=False, verbose_name="生成済みの日付"
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="作成日時")
+
+    objects = AssignmentRecurrenceQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "繰り返し課題"
+        verbose_name_plural = "繰り返し課題"
+        ordering = ["lecture", "starts_on"]
+
+    def __str__(self):
+        return f"{self.title_template} ({self.lecture.name})"
+
 
 class SubmissionRecord(models.Model):
     """提出記録モデル"""
@@ -102,17 +517,25 @@ class SubmissionRecord(models.Model):
     )
     submitted_at = models.DateTimeField(verbose_name="提出日時")
     notes = models.TextField(blank=True, verbose_name="備考")
+    version = models.PositiveIntegerField(default=0, verbose_name="バージョン")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="更新日時")
+
+    objects = ActiveManager.from_queryset(SubmissionRecordQuerySet)()
+    all_objects = SubmissionRecordQuerySet.as_manager()
 
     class Meta:
         verbose_name = "提出記録"
         verbose_name_plural = "提出記録"
         ordering = ["-submitted_at"]
+        indexes = [
+            models.Index(fields=["updated_at"], name="submission_updated_idx"),
+        ]
 
     def __str__(self):
         return f"{self.assignment.title} - 提出済み"
 
 
-class Grading(models.Model):
+class Grading(AuditedModel):
     """採点記録モデル（先生のみが編集可能）"""
 
     submission = models.OneToOneField(
@@ -123,12 +546,247 @@ class Grading(models.Model):
     )
     grade = models.IntegerField(verbose_name="成績")
     feedback = models.TextField(blank=True, verbose_name="フィードバック")
+    version = models.PositiveIntegerField(default=0, verbose_name="バージョン")
     graded_at = models.DateTimeField(auto_now=True, verbose_name="採点日時")
 
+    objects = ActiveManager.from_queryset(GradingQuerySet)()
+    all_objects = GradingQuerySet.as_manager()
+
     class Meta:
         verbose_name = "採点記録"
         verbose_name_plural = "採点記録"
         ordering = ["-graded_at"]
+        indexes = [
+            models.Index(fields=["graded_at"], name="grading_graded_at_idx"),
+        ]
 
     def __str__(self):
         return f"{self.submission.assignment.title} - {self.grade}点"
+
+
+class DeadlineReminder(models.Model):
+    """締切リマインダー（送信待ちアウトボックス）"""
+
+    THRESHOLD_CHOICES = [
+        ("3d", "3日前"),
+        ("1d", "1日前"),
+        ("overdue", "期限超過"),
+    ]
+
+    assignment = models.ForeignKey(
+        Assignment,
+        on_delete=models.CASCADE,
+        related_name="reminders",
+        verbose_name="課題",
+    )
+    threshold = models.CharField(
+        max_length=10, choices=THRESHOLD_CHOICES, verbose_name="通知タイミング"
+    )
+    due_date = models.DateTimeField(verbose_name="通知時点の提出期限")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="作成日時")
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name="送信日時")
+
+    class Meta:
+        verbose_name = "締切リマインダー"
+        verbose_name_plural = "締切リマインダー"
+        ordering = ["-created_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["assignment", "threshold"], name="unique_reminder_per_threshold"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.assignment_id} - {self.get_threshold_display()}"
+
+
+class ReminderWatermark(models.Model):
+    """リマインダー走査の処理済み位置（通知タイミングごと）"""
+
+    threshold = models.CharField(
+        max_length=10,
+        choices=DeadlineReminder.THRESHOLD_CHOICES,
+        unique=True,
+        verbose_name="通知タイミング",
+    )
+    scanned_until = models.DateTimeField(verbose_name="走査済み時刻")
+
+    class Meta:
+        verbose_name = "リマインダー走査位置"
+        verbose_name_plural = "リマインダー走査位置"
+
+    def __str__(self):
+        return f"{self.threshold}: {self.scanned_until}"
+
+
+class ChangeLog(models.Model):
+    """変更履歴（追記専用）
+
+    changed_at による期間パーティション分割ができるよう外部キーは持たず、
+    対象を (model, object_id) で参照する。
+    """
+
+    model = models.CharField(max_length=50, verbose_name="対象モデル")
+    object_id = models.BigIntegerField(verbose_name="対象ID")
+    field = models.CharField(max_length=50, verbose_name="項目")
+    old_value = models.TextField(blank=True, verbose_name="変更前")
+    new_value = models.TextField(blank=True, verbose_name="変更後")
+    changed_by = models.CharField(max_length=150, blank=True, verbose_name="変更者")
+    changed_at = models.DateTimeField(default=timezone.now, verbose_name="変更日時")
+
+    class Meta:
+        verbose_name = "変更履歴"
+        verbose_name_plural = "変更履歴"
+        ordering = ["-changed_at"]
+        indexes = [
+            models.Index(
+                fields=["model", "object_id", "changed_at"],
+                name="changelog_object_idx",
+            ),
+            models.Index(fields=["changed_at"], name="changelog_changed_at_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.model}#{self.object_id} {self.field}"
+
+    def save(self, *args, **kwargs):
+        if self.pk is not None:
+            raise ValueError("変更履歴は追記のみ可能です")
+        super().save(*args, **kwargs)
+
+
+class MetricSnapshot(models.Model):
+    """ダッシュボード指標の日次スナップショット（コース単位）
+
+    古い日次行は週単位に間引く（週の最終日の行だけを残す）。
+    推移グラフはこの表だけを読む。
+    """
+
+    PERIOD_CHOICES = [
+        ("day", "日次"),
+        ("week", "週次"),
+    ]
+
+    course = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name="metric_snapshots",
+        verbose_name="コース",
+    )
+    date = models.DateField(verbose_name="日付")
+    period = models.CharField(
+        max_length=10, choices=PERIOD_CHOICES, default="day", verbose_name="粒度"
+    )
+    pending_count = models.PositiveIntegerField(default=0, verbose_name="未提出")
+    submitted_count = models.PositiveIntegerField(default=0, verbose_name="提出済み")
+    graded_count = models.PositiveIntegerField(default=0, verbose_name="採点済み")
+    high_count = models.PositiveIntegerField(default=0, verbose_name="優先度: 高")
+    medium_count = models.PositiveIntegerField(default=0, verbose_name="優先度: 中")
+    low_count = models.PositiveIntegerField(default=0, verbose_name="優先度: 低")
+    # {講義ID: 課題数}
+    lecture_counts = models.JSONField(default=dict, verbose_name="講義別課題数")
+    grade_count = models.PositiveIntegerField(default=0, verbose_name="採点件数")
+    average_grade = models.FloatField(null=True, verbose_name="平均成績")
+
+    objects = MetricSnapshotQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "指標スナップショット"
+        verbose_name_plural = "指標スナップショット"
+        ordering = ["date"]
+        indexes = [
+            models.Index(fields=["course", "date"], name="metric_course_date_idx"),
+            models.Index(fields=["period", "date"], name="metric_period_date_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.course_id} {self.date} ({self.period})"
+
+
+class SyncTombstone(models.Model):
+    """差分同期のための削除記録（墓標）
+
+    削除された行の所有者・コースを複製しておき、``visible_to`` で絞り込めるようにする。
+    保持期間を過ぎた墓標は削除し、それより古い時刻からの同期は全件の取り直しにする。
+    """
+
+    model = models.CharField(max_length=50, verbose_name="対象モデル")
+    object_id = models.BigIntegerField(verbose_name="対象ID")
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name="+",
+        verbose_name="所有者",
+    )
+    course = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name="+",
+        verbose_name="コース",
+    )
+    deleted_at = models.DateTimeField(default=timezone.now, verbose_name="削除日時")
+
+    objects = SyncTombstoneQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "削除記録"
+        verbose_name_plural = "削除記録"
+        ordering = ["deleted_at"]
+        indexes = [
+            models.Index(fields=["deleted_at"], name="tombstone_deleted_at_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.model}#{self.object_id}"
+
+
+class AssignmentSignature(models.Model):
+    """課題の題名・説明の MinHash シグネチャ（似ている課題・重複の検出用）
+
+    ``digest`` は正規化した本文のハッシュで、本文が変わらない保存では作り直さない。
+    """
+
+    assignment = models.OneToOneField(
+        Assignment,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="signature",
+        verbose_name="課題",
+    )
+    digest = models.CharField(max_length=32, verbose_name="本文のハッシュ")
+    minhash = models.JSONField(verbose_name="MinHash")
+
+    class Meta:
+        verbose_name = "課題のシグネチャ"
+        verbose_name_plural = "課題のシグネチャ"
+
+    def __str__(self):
+        return f"{self.assignment_id} ({self.digest[:8]})"
+
+
+class AssignmentSignatureBand(models.Model):
+    """LSH のバケット（同じバケットに入った課題どうしだけを比較する）"""
+
+    signature = models.ForeignKey(
+        AssignmentSignature,
+        on_delete=models.CASCADE,
+        related_name="bands",
+        verbose_name="シグネチャ",
+    )
+    bucket = models.BigIntegerField(verbose_name="バケット")
+
+    class Meta:
+        verbose_name = "LSH バケット"
+        verbose_name_plural = "LSH バケット"
+        indexes = [
+            # 候補の検索と、バケット順の全件走査（重複レポート）の両方に使う
+            models.Index(
+                fields=["bucket", "signature"], name="signature_band_bucket_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.signature_id}: {self.bucket}"
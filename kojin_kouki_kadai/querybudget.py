@@ -0,0 +1,57 @@
+import time
+from collections import namedtuple
+from contextlib import ExitStack
+
+from django.db import connections
+
+# queries は 1 リクエストのクエリ数の上限、db_time は DB 時間の合計の上限（ミリ秒）
+QueryBudget = namedtuple("QueryBudget", ["queries", "db_time"])
+
+
+class QueryBudgetExceeded(Exception):
+    """厳格モード（``QUERY_BUDGET_STRICT``）でクエリ予算を超えたときに送出する"""
+
+
+def query_budget(queries, db_time=200):
+    """ビュー関数・ビュークラスにクエリ予算を宣言するデコレータ
+
+    計測と判定は ``QueryBudgetMiddleware`` が行うため、テンプレートの
+    遅延描画中に発行されるクエリも予算に含まれる。
+    """
+
+    def decorator(view):
+        view.query_budget = QueryBudget(queries, db_time)
+        return view
+
+    return decorator
+
+
+def get_query_budget(view_func):
+    """URL に紐づくビューが宣言しているクエリ予算（無ければ None）"""
+    view = getattr(view_func, "view_class", view_func)
+    return getattr(view, "query_budget", None)
+
+
+class QueryCounter:
+    """全データベース接続のクエリ数と実行時間を数える execute_wrapper"""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += (time.perf_counter() - start) * 1000
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
@@ -0,0 +1,123 @@
+import bisect
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Assignment, AssignmentRecurrence
+from .schedule import DAY_ORDER
+from .similarity import build_missing_signatures
+
+# 課題として実体化しておく期間（これより先は計算で扱う）
+MATERIALIZE_HORIZON = timedelta(weeks=4)
+
+# week は開始から何週目か（1 始まり、休講日も数える）、number は休講日を除いた回数
+Occurrence = namedtuple("Occurrence", ["week", "number", "title", "due_date"])
+
+
+def first_lecture_date(recurrence):
+    """開始日以降で最初の講義日"""
+    weekday = DAY_ORDER.index(recurrence.lecture.day_of_week)
+    days_ahead = (weekday - recurrence.starts_on.weekday()) % 7
+    return recurrence.starts_on + timedelta(days=days_ahead)
+
+
+def occurrences_between(recurrence, start, end):
+    """start〜end（両端を含む日付）の回を DB に書き込まずに計算する
+
+    何週目かは開始日からの日数で直接求め、休講日による回数のずれは
+    ソート済みの休講日リストの二分探索で求めるため、先の期間でも
+    該当する回の数に比例する計算量で済む。
+    """
+    first = first_lecture_date(recurrence)
+    step = 7 * recurrence.interval_weeks
+    start = max(start, first)
+    if recurrence.ends_on:
+        end = min(end, recurrence.ends_on)
+    if end < start:
+        return []
+
+    # 講義日に当たる休講日だけを数える
+    exceptions = sorted(
+        day
+        for day in map(date.fromisoformat, recurrence.exception_dates)
+        if day >= first and (day - first).days % step == 0
+    )
+
+    occurrences = []
+    week_index = -(-(start - first).days // step)
+    day = first + timedelta(days=step * week_index)
+    while day <= end:
+        skipped = bisect.bisect_right(exceptions, day)
+        if not (skipped and exceptions[skipped - 1] == day):
+            number = week_index + 1 - skipped
+            occurrences.append(
+                Occurrence(
+                    week=week_index + 1,
+                    number=number,
+                    title=recurrence.title_template.replace("{n}", str(number)),
+                    due_date=timezone.make_aware(
+                        datetime.combine(day, recurrence.due_time)
+                    ),
+                )
+            )
+        week_index += 1
+        day += timedelta(days=step)
+    return occurrences
+
+
+def materialize(recurrence, until):
+    """until までの回を課題として bulk_create し、生成済みの日付を進める"""
+    if recurrence.materialized_until:
+        start = recurrence.materialized_until + timedelta(days=1)
+    else:
+        start = recurrence.starts_on
+
+    assignments = [
+        Assignment(
+            lecture_id=recurrence.lecture_id,
+            course_id=recurrence.lecture.course_id,
+            owner_id=recurrence.owner_id,
+            recurrence=recurrence,
+            occurrence_number=occurrence.week,
+            title=occurrence.title,
+            description=recurrence.description,
+            due_date=occurrence.due_date,
+            priority=recurrence.priority,
+        )
+        for occurrence in occurrences_between(recurrence, start, until)
+    ]
+    # 同時実行などで生成済みの回は一意制約で無視する
+    Assignment.objects.bulk_create(assignments, ignore_conflicts=True)
+    # bulk_create では post_save が送られず、ignore_conflicts では ID も返らないため、
+    # 重複検出用のシグネチャは生成した回を読み直して作る
+    if assignments:
+        build_missing_signatures(
+            Assignment.all_objects.filter(
+                recurrence=recurrence,
+                occurrence_number__in=[a.occurrence_number for a in assignments],
+            )
+        )
+
+    recurrence.materialized_until = until
+    recurrence.save(update_fields=["materialized_until"])
+    return assignments
+
+
+def materialize_due(today=None):
+    """生成済みの日付が期間の終わりに届いていないルールを実体化する
+
+    アーカイブ済みの講義のルールからは生成しない（課題が通常の一覧に戻ってしまうため）。
+    """
+    today = today or timezone.localdate()
+    until = today + MATERIALIZE_HORIZON
+    recurrences = (
+        AssignmentRecurrence.objects.filter(
+            Q(materialized_until__isnull=True) | Q(materialized_until__lt=until),
+            lecture__archived=False,
+        )
+        .exclude(ends_on__lte=F("materialized_until"))
+        .select_related("lecture")
+    )
+    return sum(len(materialize(recurrence, until)) for recurrence in recurrences)
@@ -0,0 +1,96 @@
+import json
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Assignment, DeadlineReminder, ReminderWatermark
+
+# 通知タイミング -> 提出期限の何時間前に通知するか
+THRESHOLD_OFFSETS = {
+    "3d": timedelta(days=3),
+    "1d": timedelta(days=1),
+    "overdue": timedelta(0),
+}
+
+
+def scan_due_reminders(now=None, lookback=timedelta(days=1)):
+    """前回走査以降に通知タイミングを迎えた未提出課題のリマインダーを作成する
+
+    通知タイミングごとに前回の走査時刻（ウォーターマーク）を保持し、
+    ``(status, due_date)`` インデックスで次の区間だけを範囲検索する。
+
+        前回走査時刻 + オフセット < due_date <= 今回走査時刻 + オフセット
+
+    初回は ``lookback`` 分だけ遡った時刻をウォーターマークとして作成する。
+    作成対象となったリマインダーのリストを返す。
+    """
+    now = now or timezone.now()
+    created = []
+
+    with transaction.atomic():
+        # 初回は行が無くロックできず、同時に走った走査が同じリマインダーを作ってしまうため、
+        # 先にウォーターマークを作っておく（他の走査が作成済みなら何もしない）
+        ReminderWatermark.objects.bulk_create(
+            [
+                ReminderWatermark(threshold=threshold, scanned_until=now - lookback)
+                for threshold in THRESHOLD_OFFSETS
+            ],
+            ignore_conflicts=True,
+        )
+        watermarks = ReminderWatermark.objects.select_for_update().filter(
+            threshold__in=THRESHOLD_OFFSETS
+        )
+
+        for watermark in watermarks:
+            offset = THRESHOLD_OFFSETS[watermark.threshold]
+            since = watermark.scanned_until
+            if since >= now:
+                continue
+
+            due_rows = list(
+                Assignment.objects.filter(
+                    status="pending",
+                    due_date__gt=since + offset,
+                    due_date__lte=now + offset,
+                ).values_list("pk", "due_date")
+            )
+            # 期限変更などで同じ課題・タイミングが再度範囲に入った場合は作成済みなので除く
+            # （戻り値をアウトボックスに書き出すため、一意制約で黙って捨てられる行を返さない）
+            existing = set(
+                DeadlineReminder.objects.filter(
+                    threshold=watermark.threshold,
+                    assignment_id__in=[pk for pk, _ in due_rows],
+                ).values_list("assignment_id", flat=True)
+            )
+            reminders = [
+                DeadlineReminder(
+                    assignment_id=pk, threshold=watermark.threshold, due_date=due_date
+                )
+                for pk, due_date in due_rows
+                if pk not in existing
+            ]
+            DeadlineReminder.objects.bulk_create(reminders)
+            created.extend(reminders)
+
+            watermark.scanned_until = now
+            watermark.save(update_fields=["scanned_until"])
+
+    return created
+
+
+def write_outbox_file(path, reminders):
+    """リマインダーを JSON Lines 形式でファイルに追記する"""
+    with open(path, "a", encoding="utf-8") as f:
+        for reminder in reminders:
+            f.write(
+                json.dumps(
+                    {
+                        "assignment_id": reminder.assignment_id,
+                        "threshold": reminder.threshold,
+                        "due_date": reminder.due_date.isoformat(),
+                    },
+                    ensure_ascii=False,
+                )
+                + "\n"
+            )
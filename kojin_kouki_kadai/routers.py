@@ -0,0 +1,65 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+REPLICA_ALIAS = "replica"
+
+# read_from_replica() の中だけ値（そのブロックで書き込んだか）を持つ
+_replica_state = ContextVar("replica_state", default=None)
+
+
+@contextmanager
+def read_from_replica():
+    """このブロック内の読み取りクエリをレプリカに向ける
+
+    ブロック内で一度でも書き込むと、以降の読み取りはプライマリに固定する
+    （書き込んだ行をレプリカの遅延で読み損なわないため）。戻り値の
+    ``state["wrote"]`` で書き込みの有無を確認できる。
+    """
+    state = {"wrote": False}
+    token = _replica_state.set(state)
+    try:
+        yield state
+    finally:
+        _replica_state.reset(token)
+
+
+@contextmanager
+def read_from_primary():
+    """``read_from_replica()`` の中でも、このブロック内の読み取りはプライマリから行う
+
+    レプリカの遅延で行を読み損なうと困る処理（差分同期のカーソルなど）に使う。
+    """
+    token = _replica_state.set(None)
+    try:
+        yield
+    finally:
+        _replica_state.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """読み取り専用リクエストの参照をレプリカへ振り分けるルーター
+
+    書き込みは常にプライマリ（default）へ送る。読み取りは
+    ``read_from_replica()`` の中でのみ、書き込むまでの間レプリカを使い、
+    それ以外（POST 処理、管理コマンドなど）はプライマリから読む。
+    settings.py で ``replica`` が定義されたときだけ有効になる。
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _replica_state.get()
+        if state is not None and not state["wrote"]:
+            return REPLICA_ALIAS
+        return "default"
+
+    def db_for_write(self, model, **hints):
+        state = _replica_state.get()
+        if state is not None:
+            state["wrote"] = True
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # レプリカはプライマリの複製なので同じ DB として扱う
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == "default"
@@ -0,0 +1,80 @@
+import heapq
+from collections import defaultdict
+from itertools import chain
+
+from .models import Lecture
+
+DAY_ORDER = [value for value, _ in Lecture._meta.get_field("day_of_week").choices]
+
+
+def _sweep(groups):
+    """グループごとに開始時刻でソートし、時間が重なる講義の組を列挙する"""
+    conflicts = []
+    for day_lectures in groups:
+        # 保存前の講義は pk が None なので 0 として並べる
+        day_lectures.sort(key=lambda lecture: (lecture.start_time, lecture.pk or 0))
+        active = []  # (終了時刻, 並び順, 講義) のヒープ
+        for order, lecture in enumerate(day_lectures):
+            while active and active[0][0] <= lecture.start_time:
+                heapq.heappop(active)
+            conflicts.extend((other, lecture) for _, _, other in active)
+            heapq.heappush(active, (lecture.end_time, order, lecture))
+    return conflicts
+
+
+def room_conflicts(lectures):
+    """lectures と同じ教室で時間が重なる講義の組を、コースをまたいで列挙する
+
+    教室の予約は lectures に含まれない講義（閲覧できない他のコースの講義など）とも
+    重なるため、同じ教室・曜日の講義を (classroom, day_of_week, start_time) インデックスで
+    読み足してから、教室・学期・曜日ごとにスイープする。
+    lectures には保存前の講義（フォームの入力値）を含めてもよい。
+    戻り値は lectures の講義を少なくとも一方に含む (先に始まる講義, 後に始まる講義) のリスト。
+    """
+    lectures = list(lectures)
+    given = {id(lecture) for lecture in lectures}
+    booked = Lecture.objects.filter(
+        classroom__in={lecture.classroom for lecture in lectures},
+        day_of_week__in={lecture.day_of_week for lecture in lectures},
+    ).exclude(pk__in=[lecture.pk for lecture in lectures if lecture.pk])
+
+    rooms = defaultdict(list)
+    for lecture in chain(lectures, booked if lectures else []):
+        rooms[(lecture.classroom, lecture.term_id, lecture.day_of_week)].append(lecture)
+    return [
+        (first, second)
+        for first, second in _sweep(rooms.values())
+        if id(first) in given or id(second) in given
+    ]
+
+
+def find_conflicts(lectures):
+    """時間が重なる講義の組を列挙する
+
+    コースの時間割（コース・学期・曜日）ごとに開始時刻でソートし、スイープラインで
+    走査する。実施中の講義を終了時刻のヒープで持つため、全組み合わせを比較せずに
+    O(n log n + 重なりの数) で求まる。教室の重なりは ``room_conflicts`` で、
+    lectures に含まれない他のコースの講義も含めて検出する。
+    戻り値は (先に始まる講義, 後に始まる講義) のリストで、曜日・開始時刻の順に並ぶ。
+    """
+    lectures = list(lectures)
+    timetable = defaultdict(list)
+    for lecture in lectures:
+        key = (lecture.course_id, lecture.term_id, lecture.day_of_week)
+        timetable[key].append(lecture)
+
+    # 同じコースで同じ教室の組は両方に現れるため 1 つにまとめる
+    conflicts = {
+        (first.pk, second.pk): (first, second)
+        for first, second in _sweep(timetable.values()) + room_conflicts(lectures)
+    }
+    return sorted(
+        conflicts.values(),
+        key=lambda pair: (
+            DAY_ORDER.index(pair[1].day_of_week),
+            pair[1].start_time,
+            pair[0].start_time,
+            pair[1].pk,
+            pair[0].pk,
+        ),
+    )
@@ -0,0 +1,239 @@
+import hashlib
+import random
+import unicodedata
+from itertools import groupby
+
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import Assignment, AssignmentSignature, AssignmentSignatureBand
+
+# 文字 n-gram の長さ（日本語は分かち書きしないため単語ではなく文字で区切る）
+SHINGLE_SIZE = 2
+
+# MinHash の長さと LSH の分割。16 バンド × 4 行で、類似度 0.5 付近から候補になり始め、
+# 0.8 以上の組はほぼ確実に同じバケットに入る
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+# 作成画面の「似ている課題」と重複レポートの類似度（Jaccard 係数の推定値）の下限
+PANEL_THRESHOLD = 0.5
+REPORT_THRESHOLD = 0.8
+
+_PRIME = (1 << 61) - 1
+# プロセスをまたいで同じシグネチャになるよう、ハッシュ関数の係数は固定の乱数列から作る
+_rng = random.Random(20260101)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)
+]
+
+
+def normalize(title, description):
+    """全角・半角と大文字・小文字をそろえ、空白を取り除く"""
+    text = unicodedata.normalize("NFKC", f"{title}{description}").lower()
+    return "".join(text.split())
+
+
+def shingles(text):
+    if len(text) <= SHINGLE_SIZE:
+        return {text} if text else set()
+    return {text[i : i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def _hash64(value):
+    return int.from_bytes(
+        hashlib.blake2b(value.encode(), digest_size=8).digest(), "big"
+    )
+
+
+def minhash(text):
+    """正規化済みの本文の MinHash シグネチャ（NUM_PERM 個の整数）"""
+    hashes = [_hash64(shingle) for shingle in shingles(text)]
+    if not hashes:
+        return []
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def band_buckets(signature):
+    """シグネチャを BANDS 個に分け、バンド番号ごとに区別したバケット値にする"""
+    buckets = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS : (band + 1) * ROWS]
+        digest = hashlib.blake2b(repr((band, rows)).encode(), digest_size=8).digest()
+        buckets.append(int.from_bytes(digest, "big", signed=True))
+    return buckets
+
+
+def similarity(a, b):
+    """2 つのシグネチャから Jaccard 係数を推定する"""
+    if not a or not b:
+        return 0.0
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+def update_signature(assignment, created=False):
+    """題名・説明が変わっていればシグネチャとバケットを作り直す"""
+    text = normalize(assignment.title, assignment.description)
+    digest = hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+    signatures = AssignmentSignature.objects.filter(pk=assignment.pk)
+    if not created and signatures.filter(digest=digest).exists():
+        return False
+
+    signature = minhash(text)
+    with transaction.atomic():
+        if created or not signatures.update(digest=digest, minhash=signature):
+            AssignmentSignature.objects.create(
+                assignment_id=assignment.pk, digest=digest, minhash=signature
+            )
+        else:
+            AssignmentSignatureBand.objects.filter(signature_id=assignment.pk).delete()
+        AssignmentSignatureBand.objects.bulk_create(
+            [
+                AssignmentSignatureBand(signature_id=assignment.pk, bucket=bucket)
+                for bucket in band_buckets(signature)
+            ]
+        )
+    return True
+
+
+@receiver(post_save, sender=Assignment)
+def record_signature(
+    sender, instance, created, raw=False, update_fields=None, **kwargs
+):
+    if raw:
+        return
+    # 題名・説明を含まない部分更新（ステータスの変更など）では作り直さない
+    if update_fields is not None and not {"title", "description"} & update_fields:
+        return
+    update_signature(instance, created=created)
+
+
+def create_signatures(assignments):
+    """シグネチャの無い課題（bulk_create で作られた行など）のシグネチャをまとめて作る"""
+    signatures = []
+    bands = []
+    for assignment in assignments:
+        text = normalize(assignment.title, assignment.description)
+        signature = minhash(text)
+        signatures.append(
+            AssignmentSignature(
+                assignment_id=assignment.pk,
+                digest=hashlib.blake2b(text.encode(), digest_size=16).hexdigest(),
+                minhash=signature,
+            )
+        )
+        bands.extend(
+            AssignmentSignatureBand(signature_id=assignment.pk, bucket=bucket)
+            for bucket in band_buckets(signature)
+        )
+    if signatures:
+        with transaction.atomic():
+            AssignmentSignature.objects.bulk_create(signatures)
+            AssignmentSignatureBand.objects.bulk_create(bands)
+    return len(signatures)
+
+
+def build_missing_signatures(queryset, chunk_size=1000):
+    """queryset のうちシグネチャの無い課題のシグネチャを作る"""
+    built = 0
+    rows = queryset.filter(signature__isnull=True).only("title", "description")
+    while True:
+        # 作成した行は絞り込みから外れるため、常に先頭から取り直す
+        chunk = list(rows.order_by("pk")[:chunk_size])
+        built += create_signatures(chunk)
+        if len(chunk) < chunk_size:
+            return built
+
+
+def similar_assignments(queryset, title, description, threshold=PANEL_THRESHOLD):
+    """queryset のうち、題名・説明が似ている課題を類似度の高い順に返す
+
+    同じバケットに入った課題だけを 1 回のクエリで取り出して比較する。
+    各課題には ``similarity`` 属性を付ける。
+    """
+    signature = minhash(normalize(title, description))
+    if not signature:
+        return []
+    candidates = (
+        queryset.filter(signature__bands__bucket__in=band_buckets(signature))
+        .select_related("lecture", "signature")
+        .distinct()
+    )
+    results = []
+    for assignment in candidates:
+        assignment.similarity = similarity(signature, assignment.signature.minhash)
+        if assignment.similarity >= threshold:
+            results.append(assignment)
+    results.sort(key=lambda a: -a.similarity)
+    return results
+
+
+def duplicate_groups(queryset, threshold=REPORT_THRESHOLD, chunk_size=1000):
+    """queryset の中で題名・説明が重複している課題の ID をグループにまとめて返す
+
+    所有者ごとにバケット順に並べたバンドを 1 回走査して、同じ所有者で同じバケットに
+    入った課題の組だけを比較する（全組み合わせの比較はしない）。同じ繰り返しルールから
+    生成された回は意図した重複なので除く。
+    似ている組を順にたどって広げる（単連結）と、少しずつ違う課題が鎖のようにつながって
+    閾値未満の組まで同じグループになるため、グループの全員と閾値以上に似ている場合だけ
+    まとめる（完全連結）。
+    """
+    owner = "signature__assignment__owner_id"
+    bands = (
+        AssignmentSignatureBand.objects.filter(signature__assignment__in=queryset)
+        .order_by("bucket", owner)
+        .values_list("bucket", owner, "signature_id")
+    )
+    collisions = []
+    for _, rows in groupby(
+        bands.iterator(chunk_size=chunk_size), key=lambda r: (r[0], r[1])
+    ):
+        ids = [pk for _, _, pk in rows]
+        if len(ids) > 1:
+            collisions.append(ids)
+
+    candidate_ids = sorted({pk for ids in collisions for pk in ids})
+    signatures = {}
+    for start in range(0, len(candidate_ids), chunk_size):
+        chunk = candidate_ids[start : start + chunk_size]
+        for pk, signature, recurrence_id in AssignmentSignature.objects.filter(
+            pk__in=chunk
+        ).values_list("pk", "minhash", "assignment__recurrence_id"):
+            signatures[pk] = (signature, recurrence_id)
+
+    def similar(a, b):
+        return similarity(signatures[a][0], signatures[b][0]) >= threshold
+
+    scores = {}
+    for ids in collisions:
+        for i, a in enumerate(ids):
+            for b in ids[i + 1 :]:
+                pair = (min(a, b), max(a, b))
+                if pair in scores:
+                    continue
+                (sig_a, rec_a), (sig_b, rec_b) = signatures[a], signatures[b]
+                if rec_a is not None and rec_a == rec_b:
+                    scores[pair] = None
+                else:
+                    scores[pair] = similarity(sig_a, sig_b)
+
+    # 似ている組から順に、両方のグループの全員どうしが閾値以上ならまとめる
+    group_of = {}
+    pairs = sorted(
+        (pair for pair, score in scores.items() if score and score >= threshold),
+        key=lambda pair: (-scores[pair], pair),
+    )
+    for a, b in pairs:
+        group_a = group_of.get(a, {a})
+        group_b = group_of.get(b, {b})
+        if group_a is group_b:
+            continue
+        if all(similar(x, y) for x in group_a for y in group_b):
+            merged = group_a | group_b
+            for pk in merged:
+                group_of[pk] = merged
+
+    groups = {min(group): sorted(group) for group in group_of.values()}
+    return sorted(groups.values(), key=lambda g: (-len(g), g))
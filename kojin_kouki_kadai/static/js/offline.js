@@ -0,0 +1,140 @@
+// オフライン対応の締切一覧
+// /sync/ から前回以降の差分だけを取得して localStorage に保存し、保存済みのデータで描画する。
+// 保存先はユーザーごとに分け、最後に同期したユーザーを USER_KEY に記録する。
+// ログアウト時は base.html が STORAGE_PREFIX で始まるキーをすべて消す。
+(function () {
+    const script = document.currentScript;
+    const SYNC_URL = script.dataset.syncUrl;
+    const DETAIL_URL = script.dataset.detailUrl;
+    const LOGIN_URL = script.dataset.loginUrl;
+    const STORAGE_PREFIX = 'kadai-sync';
+    const USER_KEY = STORAGE_PREFIX + '-user';
+
+    // 墓標のモデル名 -> 保存先
+    const TABLES = {
+        assignment: 'assignments',
+        submissionrecord: 'submissions',
+        grading: 'gradings'
+    };
+    const STATUS_LABELS = { pending: '未提出', submitted: '提出済み', graded: '採点済み' };
+    const STATUS_BADGES = { pending: 'bg-secondary', submitted: 'bg-info', graded: 'bg-success' };
+
+    function storageKey(userId) {
+        return STORAGE_PREFIX + '-v2:' + userId;
+    }
+
+    function emptyState(userId) {
+        return { userId: userId, since: null, assignments: {}, submissions: {}, gradings: {} };
+    }
+
+    function loadState() {
+        const userId = localStorage.getItem(USER_KEY);
+        if (userId === null) {
+            return emptyState(null);
+        }
+        try {
+            return JSON.parse(localStorage.getItem(storageKey(userId))) || emptyState(userId);
+        } catch (error) {
+            return emptyState(userId);
+        }
+    }
+
+    function saveState(state) {
+        localStorage.setItem(USER_KEY, state.userId);
+        localStorage.setItem(storageKey(state.userId), JSON.stringify(state));
+    }
+
+    function clearStates() {
+        Object.keys(localStorage)
+            .filter(key => key.startsWith(STORAGE_PREFIX))
+            .forEach(key => localStorage.removeItem(key));
+    }
+
+    function applyDelta(state, delta) {
+        if (delta.reset) {
+            state = emptyState(state.userId);
+        }
+        Object.values(TABLES).forEach(table => {
+            delta[table].forEach(row => { state[table][row.id] = row; });
+        });
+        delta.deleted.forEach(tombstone => {
+            delete state[TABLES[tombstone.model]][tombstone.object_id];
+        });
+        state.since = delta.since;
+        return state;
+    }
+
+    function render(state, message) {
+        const list = document.getElementById('assignment-list');
+        list.replaceChildren();
+        const assignments = Object.values(state.assignments)
+            .sort((a, b) => a.due_date.localeCompare(b.due_date));
+
+        assignments.forEach(assignment => {
+            const item = document.createElement('a');
+            item.className = 'list-group-item list-group-item-action d-flex justify-content-between align-items-center';
+            item.href = DETAIL_URL.replace('/0/', '/' + assignment.id + '/');
+
+            const title = document.createElement('div');
+            const name = document.createElement('strong');
+            name.textContent = assignment.title;
+            const lecture = document.createElement('div');
+            lecture.className = 'small text-muted';
+            lecture.textContent = assignment.lecture_name + ' / ' +
+                new Date(assignment.due_date).toLocaleString('ja-JP');
+            title.append(name, lecture);
+
+            const badge = document.createElement('span');
+            badge.className = 'badge ' + STATUS_BADGES[assignment.status];
+            badge.textContent = STATUS_LABELS[assignment.status];
+
+            item.append(title, badge);
+            list.append(item);
+        });
+
+        if (!assignments.length) {
+            const item = document.createElement('li');
+            item.className = 'list-group-item text-muted';
+            item.textContent = '課題はありません';
+            list.append(item);
+        }
+        document.getElementById('sync-status').textContent = message;
+    }
+
+    function fetchDelta(since) {
+        const url = SYNC_URL + (since ? '?since=' + encodeURIComponent(since) : '');
+        return fetch(url, { credentials: 'same-origin', headers: { Accept: 'application/json' } })
+            .then(response => {
+                if (response.redirected) {
+                    window.location.href = LOGIN_URL + '?next=' + encodeURIComponent(window.location.pathname);
+                    throw new Error('login required');
+                }
+                if (!response.ok) {
+                    throw new Error(response.statusText);
+                }
+                return response.json();
+            });
+    }
+
+    let state = loadState();
+    fetchDelta(state.since)
+        .then(delta => {
+            const userId = String(delta.user_id);
+            if (userId === state.userId) {
+                return delta;
+            }
+            // 別のユーザーの保存データは使わず、端末から消してから全件を取り直す
+            clearStates();
+            state = emptyState(userId);
+            return delta.reset ? delta : fetchDelta(null);
+        })
+        .then(delta => {
+            state = applyDelta(state, delta);
+            saveState(state);
+            render(state, '最終同期: ' + new Date(state.since).toLocaleString('ja-JP'));
+        })
+        .catch(() => {
+            const synced = state.since ? new Date(state.since).toLocaleString('ja-JP') : 'なし';
+            render(state, 'オフラインのため保存済みのデータを表示しています（最終同期: ' + synced + '）');
+        });
+}());
@@ -0,0 +1,64 @@
+// 課題作成画面の「似ている課題」パネル
+// 題名・説明の入力が止まったら /assignments/similar/ に問い合わせ、重複の可能性がある課題を表示する。
+(function () {
+    const script = document.currentScript;
+    const SIMILAR_URL = script.dataset.similarUrl;
+    const DELAY = 400;
+
+    const panel = document.getElementById('similar-assignments');
+    const list = panel.querySelector('ul');
+    const title = document.getElementById('id_title');
+    const description = document.getElementById('id_description');
+    let timer = null;
+    let controller = null;
+
+    function render(results) {
+        list.replaceChildren();
+        for (const result of results) {
+            const item = document.createElement('li');
+            const label = `${result.title}（${result.lecture}）`;
+            if (result.url) {
+                const link = document.createElement('a');
+                link.href = result.url;
+                link.target = '_blank';
+                link.textContent = label;
+                item.append(link);
+            } else {
+                item.append(`${label} ・アーカイブ済み`);
+            }
+            item.append(` 類似度 ${Math.round(result.similarity * 100)}%`);
+            list.append(item);
+        }
+        panel.classList.toggle('d-none', results.length === 0);
+    }
+
+    async function check() {
+        if (controller) {
+            controller.abort();
+        }
+        if (!title.value.trim()) {
+            render([]);
+            return;
+        }
+        controller = new AbortController();
+        const params = new URLSearchParams({ title: title.value, description: description.value });
+        try {
+            const response = await fetch(`${SIMILAR_URL}?${params}`, { signal: controller.signal });
+            if (response.ok) {
+                render((await response.json()).results);
+            }
+        } catch (error) {
+            // 中断・通信エラーのときはパネルをそのままにする
+        }
+    }
+
+    function schedule() {
+        clearTimeout(timer);
+        timer = setTimeout(check, DELAY);
+    }
+
+    title.addEventListener('input', schedule);
+    description.addEventListener('input', schedule);
+    // 検証エラーで再表示されたときは入力済みの内容で確認する
+    check();
+})();
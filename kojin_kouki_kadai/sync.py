@@ -0,0 +1,106 @@
+from datetime import timedelta
+
+from django.db.models import F
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Assignment, Grading, SubmissionRecord, SyncTombstone
+
+# 墓標の保持期間（これより古い時刻からの同期は全件を取り直させる）
+TOMBSTONE_RETENTION = timedelta(days=30)
+
+# 次回のカーソルを問い合わせ時刻より戻す幅。updated_at はコミット前に付くため、
+# 問い合わせ時点で未コミットだった行やサーバー間の時計のずれを取りこぼさない
+CURSOR_MARGIN = timedelta(seconds=30)
+
+
+@receiver(post_delete, sender=Assignment)
+def record_assignment_deletion(sender, instance, **kwargs):
+    SyncTombstone.objects.create(
+        model="assignment",
+        object_id=instance.pk,
+        owner_id=instance.owner_id,
+        course_id=instance.course_id,
+    )
+
+
+@receiver(post_delete, sender=SubmissionRecord)
+@receiver(post_delete, sender=Grading)
+def record_submission_deletion(sender, instance, **kwargs):
+    # カスケード削除でも子（採点・提出記録）が先に消えるため、課題はまだ残っている
+    if sender is Grading:
+        assignment = Assignment.objects.filter(submission__pk=instance.submission_id)
+    else:
+        assignment = Assignment.objects.filter(pk=instance.assignment_id)
+    row = assignment.values_list("owner_id", "course_id").first()
+    owner_id, course_id = row if row else (None, None)
+    SyncTombstone.objects.create(
+        model=sender._meta.model_name,
+        object_id=instance.pk,
+        owner_id=owner_id,
+        course_id=course_id,
+    )
+
+
+def changes_since(user, since, now=None):
+    """since 以降に変更・削除された、user が見られる行を返す
+
+    since が無いか墓標の保持期間より古い場合は全件を返し、``reset`` を真にする。
+    次回は戻り値の ``since``（問い合わせ時刻から ``CURSOR_MARGIN`` 戻した時刻）を渡す。
+    その間の行は次回も重複して返るが、クライアントは ID で上書きするため問題ない。
+    レプリカの遅延で取りこぼさないよう、呼び出し側はプライマリから読むこと。
+    """
+    now = now or timezone.now()
+    reset = since is None or since < now - TOMBSTONE_RETENTION
+
+    assignments = Assignment.objects.visible_to(user)
+    submissions = SubmissionRecord.objects.visible_to(user)
+    gradings = Grading.objects.visible_to(user)
+    tombstones = SyncTombstone.objects.visible_to(user)
+    if reset:
+        tombstones = tombstones.none()
+    else:
+        assignments = assignments.filter(updated_at__gte=since)
+        submissions = submissions.filter(updated_at__gte=since)
+        gradings = gradings.filter(graded_at__gte=since)
+        tombstones = tombstones.filter(deleted_at__gte=since)
+
+    return {
+        # 端末に保存したデータを別のユーザーの差分で更新しないよう、クライアントが照合する
+        "user_id": user.pk,
+        "since": now - CURSOR_MARGIN,
+        "reset": reset,
+        "assignments": list(
+            assignments.order_by().values(
+                "id",
+                "lecture_id",
+                "title",
+                "due_date",
+                "priority",
+                "status",
+                "updated_at",
+                lecture_name=F("lecture__name"),
+            )
+        ),
+        "submissions": list(
+            submissions.order_by().values(
+                "id", "assignment_id", "submitted_at", "notes", "updated_at"
+            )
+        ),
+        "gradings": list(
+            gradings.order_by().values(
+                "id", "submission_id", "grade", "feedback", "graded_at"
+            )
+        ),
+        "deleted": list(tombstones.values("model", "object_id")),
+    }
+
+
+def prune_tombstones(now=None):
+    """保持期間を過ぎた墓標を削除する"""
+    now = now or timezone.now()
+    deleted, _ = SyncTombstone.objects.filter(
+        deleted_at__lt=now - TOMBSTONE_RETENTION
+    ).delete()
+    return deleted
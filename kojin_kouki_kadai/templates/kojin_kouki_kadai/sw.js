@@ -0,0 +1,48 @@
+// 講義課題管理 Service Worker
+// シェル（オフライン用の一覧ページと静的ファイル）をキャッシュし、
+// 画面遷移はネットワーク優先・オフライン時はシェルを返す。
+const CACHE_NAME = 'kadai-shell-{{ version }}';
+const SHELL_URLS = [{% for url in shell_urls %}'{{ url|escapejs }}'{% if not forloop.last %}, {% endif %}{% endfor %}];
+const OFFLINE_URL = SHELL_URLS[0];
+const SHELL = new Set(SHELL_URLS.map(url => new URL(url, self.location).href));
+
+self.addEventListener('install', event => {
+    event.waitUntil(
+        caches.open(CACHE_NAME)
+            .then(cache => cache.addAll(SHELL_URLS))
+            .then(() => self.skipWaiting())
+    );
+});
+
+self.addEventListener('activate', event => {
+    // 古いバージョンのキャッシュを削除する
+    event.waitUntil(
+        caches.keys()
+            .then(keys => Promise.all(
+                keys.filter(key => key.startsWith('kadai-shell-') && key !== CACHE_NAME)
+                    .map(key => caches.delete(key))
+            ))
+            .then(() => self.clients.claim())
+    );
+});
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    if (request.method !== 'GET') {
+        return;
+    }
+
+    if (request.mode === 'navigate') {
+        event.respondWith(
+            fetch(request).catch(() => caches.match(OFFLINE_URL))
+        );
+        return;
+    }
+
+    // シェルの静的ファイルはキャッシュ優先（/sync/ などの API はそのままネットワークへ）
+    if (SHELL.has(request.url)) {
+        event.respondWith(
+            caches.match(request).then(cached => cached || fetch(request))
+        );
+    }
+});
@@ -1,3 +1,1378 @@
-from django.test import TestCase
+import asyncio
+from datetime import date, time, timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib import admin
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db import connection, connections
+from django.db.models.signals import post_save
+from django.http import HttpResponse
+from django.test import (
+    LiveServerTestCase,
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .forms import LectureForm
+from .loadtest import (
+    Sample,
+    Session,
+    Targets,
+    find_saturation,
+    is_local_database,
+    parse_form,
+    run_stage,
+    seed_load_data,
+    summarize,
+)
+from .middleware import (
+    HEALTH_CHECK_PATH,
+    STICKY_COOKIE,
+    QueryBudgetMiddleware,
+    ReplicaRoutingMiddleware,
+    brotli,
+)
+from .models import (
+    Course,
+    CourseMembership,
+    Lecture,
+    Assignment,
+    AssignmentRecurrence,
+    SubmissionRecord,
+    Grading,
+    DeadlineReminder,
+    ReminderWatermark,
+    ChangeLog,
+    MetricSnapshot,
+    SyncTombstone,
+    AssignmentSignature,
+    Term,
+)
+from .archive import archive_ended_terms, archive_term
+from .metrics import downsample, take_snapshot
+from .querybudget import QueryBudgetExceeded, get_query_budget, query_budget
+from .recurrence import materialize, materialize_due, occurrences_between
+from .reminders import scan_due_reminders
+from .routers import PrimaryReplicaRouter, read_from_primary, read_from_replica
+from .schedule import find_conflicts
+from .similarity import (
+    build_missing_signatures,
+    duplicate_groups,
+    minhash,
+    normalize,
+    similarity,
+)
+from .urls import urlpatterns
+
+
+def make_member(course, username, role="student"):
+    user = User.objects.create_user(username=username, password="password")
+    CourseMembership.objects.create(course=course, user=user, role=role)
+    return user
+
+
+def make_lecture(**kwargs):
+    defaults = {
+        "name": "情報処理",
+        "instructor": "山田",
+        "day_of_week": "Monday",
+        "start_time": time(9, 0),
+        "end_time": time(10, 30),
+        "classroom": "A101",
+    }
+    defaults.update(kwargs)
+    return Lecture.objects.create(**defaults)
+
+
+def make_assignment(lecture, **kwargs):
+    defaults = {
+        "title": "第1回レポート",
+        "due_date": timezone.now() + timedelta(days=7),
+    }
+    defaults.update(kwargs)
+    return Assignment.objects.create(lecture=lecture, **defaults)
+
+
+class ScanDueRemindersTests(TestCase):
+    def setUp(self):
+        self.lecture = make_lecture()
+        self.now = timezone.now()
+
+    def test_each_threshold_is_processed_once(self):
+        assignment = make_assignment(
+            self.lecture, due_date=self.now + timedelta(hours=20)
+        )
+        make_assignment(
+            self.lecture, due_date=self.now + timedelta(hours=20), status="submitted"
+        )
+
+        created = scan_due_reminders(now=self.now)
+        self.assertEqual(
+            sorted(r.threshold for r in created if r.assignment_id == assignment.pk),
+            ["1d"],
+        )
+
+        # 同じ区間を再走査しても重複して作成されない
+        self.assertEqual(scan_due_reminders(now=self.now), [])
+
+        # 期限を過ぎた後の走査で期限超過リマインダーが作成される
+        later = self.now + timedelta(hours=21)
+        created = scan_due_reminders(now=later)
+        self.assertEqual([r.threshold for r in created], ["overdue"])
+        self.assertEqual(
+            DeadlineReminder.objects.filter(assignment=assignment).count(), 2
+        )
+
+    def test_rescheduled_assignment_is_not_reported_twice(self):
+        assignment = make_assignment(
+            self.lecture, due_date=self.now + timedelta(hours=20)
+        )
+        self.assertEqual(len(scan_due_reminders(now=self.now)), 1)
+
+        # 期限を延ばして再び 1 日前の区間に入っても、作成済みのリマインダーは返さない
+        Assignment.objects.filter(pk=assignment.pk).update(
+            due_date=self.now + timedelta(hours=30)
+        )
+        later = self.now + timedelta(hours=8)
+        self.assertEqual(scan_due_reminders(now=later), [])
+        self.assertEqual(DeadlineReminder.objects.count(), 1)
+
+    def test_first_scan_only_looks_back_lookback_window(self):
+        make_assignment(self.lecture, due_date=self.now - timedelta(days=10))
+        self.assertEqual(scan_due_reminders(now=self.now), [])
+
+    def test_watermarks_are_created_before_locking(self):
+        # 別の走査が一部のウォーターマークを作成済みでも一意制約違反にならない
+        ReminderWatermark.objects.create(threshold="1d", scanned_until=self.now)
+        make_assignment(self.lecture, due_date=self.now + timedelta(hours=20))
+        self.assertEqual(scan_due_reminders(now=self.now), [])
+        self.assertEqual(
+            dict(ReminderWatermark.objects.values_list("threshold", "scanned_until")),
+            {"3d": self.now, "1d": self.now, "overdue": self.now},
+        )
+
+
+@skipUnless(settings.ENABLE_ADMIN, "管理画面が無効")
+class AdminChangelistTests(TestCase):
+    def setUp(self):
+        self.lecture = make_lecture()
+        self.client.force_login(
+            User.objects.create_superuser(username="admin", password="password")
+        )
+
+    def changelist_queries(self, model):
+        url = reverse(f"admin:kojin_kouki_kadai_{model._meta.model_name}_changelist")
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        return len(queries)
+
+    def add_rows(self, count):
+        for _ in range(count):
+            submission = SubmissionRecord.objects.create(
+                assignment=make_assignment(self.lecture), submitted_at=timezone.now()
+            )
+            Grading.objects.create(submission=submission, grade=80)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        self.add_rows(1)
+        for model in (Assignment, SubmissionRecord, Grading):
+            with self.subTest(model._meta.model_name):
+                one = self.changelist_queries(model)
+                self.add_rows(10)
+                self.assertEqual(self.changelist_queries(model), one)
+
+    def test_changing_the_lecture_course_updates_its_assignments(self):
+        assignment = make_assignment(self.lecture)
+        course = Course.objects.create(name="情報処理A")
+        url = reverse("admin:kojin_kouki_kadai_lecture_change", args=[self.lecture.pk])
+        response = self.client.post(
+            url,
+            {
+                "course": course.pk,
+                "name": self.lecture.name,
+                "instructor": self.lecture.instructor,
+                "day_of_week": self.lecture.day_of_week,
+                "start_time": "09:00",
+                "end_time": "10:30",
+                "classroom": self.lecture.classroom,
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+        assignment.refresh_from_db()
+        self.assertEqual(assignment.course, course)
+
+    def test_benchmark_requires_the_admin(self):
+        with mock.patch.object(admin.site, "is_registered", return_value=False):
+            with self.assertRaises(CommandError):
+                call_command("benchmark_admin", repeat=1)
+
+
+@override_settings(REPLICA_STICKY_SECONDS=5)
+class ReplicaRoutingTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.router = PrimaryReplicaRouter()
+
+    def route(self, request):
+        """ミドルウェアを通したときに読み取りが向く DB を返す"""
+        seen = {}
+
+        def view(request):
+            seen["read"] = self.router.db_for_read(Assignment)
+            seen["write"] = self.router.db_for_write(Assignment)
+            return HttpResponse()
+
+        response = ReplicaRoutingMiddleware(view)(request)
+        return seen, response
+
+    def test_get_reads_from_replica(self):
+        seen, _ = self.route(self.factory.get("/"))
+        self.assertEqual(seen, {"read": "replica", "write": "default"})
+
+    def test_post_uses_primary_and_sets_sticky_cookie(self):
+        seen, response = self.route(self.factory.post("/"))
+        self.assertEqual(seen["read"], "default")
+        self.assertEqual(response.cookies[STICKY_COOKIE]["max-age"], 5)
+
+    def test_get_after_write_sticks_to_primary(self):
+        request = self.factory.get("/")
+        request.COOKIES[STICKY_COOKIE] = "1"
+        seen, _ = self.route(request)
+        self.assertEqual(seen["read"], "default")
+
+    def test_reads_outside_requests_use_primary(self):
+        self.assertEqual(self.router.db_for_read(Assignment), "default")
+
+    def test_reads_after_a_write_use_primary(self):
+        with read_from_replica() as state:
+            self.router.db_for_write(Assignment)
+            self.assertEqual(self.router.db_for_read(Assignment), "default")
+        self.assertTrue(state["wrote"])
+
+    def test_read_from_primary_overrides_replica(self):
+        with read_from_replica() as state:
+            with read_from_primary():
+                self.assertEqual(self.router.db_for_read(Assignment), "default")
+            self.assertEqual(self.router.db_for_read(Assignment), "replica")
+        self.assertFalse(state["wrote"])
+
+
+# レプリカが設定されている環境（DB_REPLICA_HOST、テストではプライマリのミラー）で実行する。
+# ミラーはテストのトランザクションの外から読むため TransactionTestCase を使う
+@skipUnless("replica" in settings.DATABASES, "レプリカが設定されていない")
+@override_settings(REPLICA_STICKY_SECONDS=5)
+class ReplicaRoutingDatabaseTests(TransactionTestCase):
+    # スキップ時もテストランナーが databases を検証するため、存在する別名に絞る
+    databases = {"default", "replica"} & settings.DATABASES.keys()
+
+    def setUp(self):
+        course = Course.objects.create(name="1年A組")
+        self.student = make_member(course, "student")
+        self.lecture = make_lecture(course=course)
+        self.client.force_login(self.student)
+
+    def capture(self, method, *args, **kwargs):
+        with CaptureQueriesContext(connections["default"]) as primary:
+            with CaptureQueriesContext(connections["replica"]) as replica:
+                response = getattr(self.client, method)(*args, **kwargs)
+        return response, primary, replica
+
+    @staticmethod
+    def selects(queries):
+        return [q for q in queries if q["sql"].startswith("SELECT")]
+
+    def test_get_reads_from_replica(self):
+        response, primary, replica = self.capture("get", reverse("assignment_list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(self.selects(replica))
+        self.assertNotIn(STICKY_COOKIE, response.cookies)
+
+    def test_post_writes_to_primary_and_sticks(self):
+        response, primary, replica = self.capture(
+            "post",
+            reverse("assignment_create"),
+            {
+                "lecture": self.lecture.pk,
+                "title": "第1回レポート",
+                "description": "",
+                "due_date": "2026-12-01T10:00",
+                "priority": "medium",
+                "status": "pending",
+                "version": 0,
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(len(replica), 0)
+        self.assertTrue(any(q["sql"].startswith("INSERT") for q in primary))
+        self.assertIn(STICKY_COOKIE, response.cookies)
+
+        # Cookie が残っている間の GET はプライマリから読む
+        response, primary, replica = self.capture("get", reverse("assignment_list"))
+        self.assertEqual(len(replica), 0)
+        self.assertTrue(self.selects(primary))
+
+    def test_get_that_writes_reads_its_own_write_from_primary(self):
+        request = RequestFactory().get("/")
+
+        def view(request):
+            Course.objects.count()
+            Course.objects.create(name="2年B組")
+            return HttpResponse(str(Course.objects.count()))
+
+        with CaptureQueriesContext(connections["default"]) as primary:
+            with CaptureQueriesContext(connections["replica"]) as replica:
+                response = ReplicaRoutingMiddleware(view)(request)
+
+        self.assertEqual(len(self.selects(replica)), 1)
+        self.assertEqual(len(self.selects(primary)), 1)
+        self.assertEqual(response.content, b"2")
+        self.assertIn(STICKY_COOKIE, response.cookies)
+
+    def test_sync_reads_from_primary(self):
+        response, primary, replica = self.capture("get", reverse("sync"))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(any("assignment" in q["sql"] for q in self.selects(primary)))
+        self.assertFalse(
+            any("kojin_kouki_kadai_assignment" in q["sql"] for q in replica)
+        )
+
+
+class OptimisticLockTests(TestCase):
+    def setUp(self):
+        course = Course.objects.create(name="1年A組")
+        student = make_member(course, "student")
+        self.assignment = make_assignment(make_lecture(course=course), owner=student)
+        self.client.force_login(student)
+        self.url = reverse("assignment_update", args=[self.assignment.pk])
+
+    def post_edit(self, title, version):
+        return self.client.post(
+            self.url,
+            {
+                "lecture": self.assignment.lecture_id,
+                "title": title,
+                "description": "",
+                "due_date": self.assignment.due_date.strftime("%Y-%m-%dT%H:%M"),
+                "priority": "medium",
+                "status": "pending",
+                "version": version,
+            },
+        )
+
+    def test_stale_version_is_rejected(self):
+        response = self.post_edit("先に保存", version=0)
+        self.assertEqual(response.status_code, 302)
+
+        response = self.post_edit("後から保存", version=0)
+        self.assertEqual(response.status_code, 409)
+
+        self.assignment.refresh_from_db()
+        self.assertEqual(self.assignment.title, "先に保存")
+        self.assertEqual(self.assignment.version, 1)
+
+    def test_status_change_invalidates_open_forms(self):
+        self.assignment.set_status("submitted")
+        response = self.post_edit("古いフォーム", version=0)
+        self.assertEqual(response.status_code, 409)
+
+    def test_successful_edit_sends_post_save(self):
+        received = []
+
+        def receiver(sender, instance, created, update_fields, **kwargs):
+            received.append((instance.pk, created, update_fields))
+
+        post_save.connect(receiver, sender=Assignment)
+        self.addCleanup(post_save.disconnect, receiver, sender=Assignment)
+
+        self.post_edit("新しい題名", version=0)
+        self.post_edit("競合した題名", version=0)
+
+        [(pk, created, update_fields)] = received
+        self.assertEqual((pk, created), (self.assignment.pk, False))
+        self.assertTrue({"title", "version"} <= update_fields)
+
+
+class ChangeLogTests(TestCase):
+    def setUp(self):
+        course = Course.objects.create(name="1年A組")
+        student = make_member(course, "student")
+        self.client.force_login(make_member(course, "teacher", role="teacher"))
+        self.assignment = make_assignment(make_lecture(course=course), owner=student)
+
+    def test_status_change_is_logged_after_request(self):
+        submission = SubmissionRecord.objects.create(
+            assignment=self.assignment, submitted_at=timezone.now()
+        )
+        response = self.client.post(
+            reverse("grading_create", args=[submission.pk]),
+            {"grade": 80, "feedback": "", "version": 0},
+        )
+        self.assertEqual(response.status_code, 302)
+
+        logs = ChangeLog.objects.order_by("model", "field")
+        self.assertEqual(
+            [(log.model, log.field, log.old_value, log.new_value) for log in logs],
+            [
+                ("assignment", "status", "pending", "graded"),
+                ("grading", "grade", "", "80"),
+            ],
+        )
+        self.assertEqual({log.changed_by for log in logs}, {"teacher"})
+
+        response = self.client.get(
+            reverse("assignment_detail", args=[self.assignment.pk])
+        )
+        self.assertEqual(len(response.context["history_page"]), 2)
+
+    def test_every_save_path_is_logged(self):
+        assignment = Assignment.objects.get(pk=self.assignment.pk)
+        assignment.save()
+        self.assertFalse(ChangeLog.objects.exists())
+
+        assignment.status = "submitted"
+        assignment.save()
+        assignment.set_status("graded")
+
+        logs = ChangeLog.objects.order_by("id")
+        self.assertEqual(
+            [(log.old_value, log.new_value) for log in logs],
+            [("pending", "submitted"), ("submitted", "graded")],
+        )
+
+    def test_change_log_is_append_only(self):
+        self.assignment.set_status("submitted")
+        log = ChangeLog.objects.get()
+        with self.assertRaises(ValueError):
+            log.save()
+
+
+class TenantScopingTests(TestCase):
+    def setUp(self):
+        self.course = Course.objects.create(name="1年A組")
+        other_course = Course.objects.create(name="1年B組")
+        self.student = make_member(self.course, "student")
+        self.classmate = make_member(self.course, "classmate")
+        self.teacher = make_member(self.course, "teacher", role="teacher")
+        outsider = make_member(other_course, "outsider")
+
+        lecture = make_lecture(course=self.course)
+        self.own = make_assignment(lecture, owner=self.student)
+        self.classmates = make_assignment(lecture, owner=self.classmate)
+        make_assignment(make_lecture(course=other_course), owner=outsider)
+
+    def test_student_sees_only_own_assignments(self):
+        self.client.force_login(self.student)
+        response = self.client.get(reverse("assignment_list"))
+        self.assertEqual(list(response.context["assignments"]), [self.own])
+
+        response = self.client.get(
+            reverse("assignment_detail", args=[self.classmates.pk])
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_teacher_sees_course_assignments(self):
+        self.client.force_login(self.teacher)
+        response = self.client.get(reverse("index"))
+        self.assertEqual(response.context["pending_count"], 2)
+
+    def test_teacher_filter_uses_course_only(self):
+        queryset = Assignment.objects.visible_to(self.teacher)
+        self.assertNotIn("owner_id", str(queryset.query).split("WHERE")[1])
+        self.assertCountEqual(queryset, [self.own, self.classmates])
+
+    def test_teacher_enrolled_elsewhere_sees_only_own_rows_there(self):
+        other_course = Course.objects.get(name="1年B組")
+        CourseMembership.objects.create(
+            course=other_course, user=self.teacher, role="student"
+        )
+        lecture = Lecture.objects.get(course=other_course)
+        own = make_assignment(lecture, owner=self.teacher)
+
+        self.assertCountEqual(
+            Assignment.objects.visible_to(self.teacher),
+            [self.own, self.classmates, own],
+        )
+
+    def test_student_cannot_grade(self):
+        submission = SubmissionRecord.objects.create(
+            assignment=self.own, submitted_at=timezone.now()
+        )
+        self.client.force_login(self.student)
+        response = self.client.get(reverse("grading_create", args=[submission.pk]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_login_required(self):
+        response = self.client.get(reverse("assignment_list"))
+        self.assertEqual(response.status_code, 302)
+
+
+class HealthCheckTests(SimpleTestCase):
+    def test_answers_without_database_or_host_validation(self):
+        # SimpleTestCase では DB に問い合わせるとエラーになる
+        response = self.client.get(HEALTH_CHECK_PATH, HTTP_HOST="10.0.0.1:8000")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"ok")
+
+
+class ConditionalListingTests(TestCase):
+    def setUp(self):
+        course = Course.objects.create(name="1年A組")
+        student = make_member(course, "student")
+        self.assignment = make_assignment(make_lecture(course=course), owner=student)
+        self.client.force_login(student)
+
+    def test_unchanged_listing_returns_304(self):
+        url = reverse("assignment_list")
+        etag = self.client.get(url)["ETag"]
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.assignment.set_status("submitted")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_deletion_changes_etag(self):
+        url = reverse("index")
+        etag = self.client.get(url)["ETag"]
+        self.assignment.delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    @skipUnless(brotli, "brotli がインストールされていない")
+    def test_brotli_length_is_padded(self):
+        url = reverse("assignment_list")
+        lengths = set()
+        for _ in range(5):
+            response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip, br")
+            self.assertEqual(response["Content-Encoding"], "br")
+            self.assertIn(b"</html>", brotli.decompress(response.content))
+            lengths.add(len(response.content))
+        # BREACH 対策の乱数長のパディングで、同じ本文でも圧縮後の長さが変わる
+        self.assertGreater(len(lengths), 1)
+
+
+class LectureScheduleTests(TestCase):
+    def setUp(self):
+        self.course = Course.objects.create(name="1年A組")
+        self.first = make_lecture(course=self.course)
+
+    def lecture_form(self, **data):
+        values = {
+            "course": self.course.pk,
+            "name": "線形代数",
+            "instructor": "佐藤",
+            "day_of_week": "Monday",
+            "start_time": "10:00",
+            "end_time": "11:30",
+            "classroom": "B201",
+        }
+        values.update(data)
+        return LectureForm(data=values)
+
+    def test_end_time_must_be_after_start_time(self):
+        form = self.lecture_form(start_time="11:00", end_time="10:00")
+        self.assertIn("end_time", form.errors)
+
+    def test_overlaps_are_rejected(self):
+        self.assertIn("classroom", self.lecture_form(classroom="A101").errors)
+        self.assertIn("start_time", self.lecture_form().errors)
+
+    def test_adjacent_and_other_day_lectures_are_accepted(self):
+        self.assertTrue(self.lecture_form(start_time="10:30").is_valid())
+        self.assertTrue(self.lecture_form(day_of_week="Tuesday").is_valid())
+
+    def test_find_conflicts_sweeps_each_day(self):
+        second = make_lecture(
+            course=self.course, start_time=time(10, 0), end_time=time(12, 0)
+        )
+        third = make_lecture(
+            course=self.course, start_time=time(11, 0), end_time=time(13, 0)
+        )
+        make_lecture(course=self.course, day_of_week="Tuesday")
+        other_course = Course.objects.create(name="1年B組")
+        # 別コースでも同じ教室なら重なる
+        same_room = make_lecture(
+            course=other_course, start_time=time(9, 30), end_time=time(10, 0)
+        )
+        make_lecture(
+            course=other_course,
+            classroom="C301",
+            start_time=time(10, 0),
+            end_time=time(11, 30),
+        )
+
+        conflicts = find_conflicts(Lecture.objects.all())
+        self.assertEqual(
+            [(a.pk, b.pk) for a, b in conflicts],
+            [
+                (self.first.pk, same_room.pk),
+                (self.first.pk, second.pk),
+                (second.pk, third.pk),
+            ],
+        )
+
+    def test_classroom_overlaps_are_checked_across_courses(self):
+        other_course = Course.objects.create(name="1年B組")
+        form = self.lecture_form(course=other_course.pk, classroom="A101")
+        # 他のコースの講義名は出さない
+        self.assertEqual(
+            form.errors["classroom"], ["この教室はその時間帯にすでに予約されています"]
+        )
+        self.assertNotIn("start_time", form.errors)
+        self.assertTrue(self.lecture_form(course=other_course.pk).is_valid())
+
+    def test_conflict_report_shows_other_courses_bookings_without_names(self):
+        other_course = Course.objects.create(name="1年B組")
+        teacher = make_member(other_course, "sensei", role="teacher")
+        mine = make_lecture(
+            course=other_course, name="線形代数", start_time=time(10, 0)
+        )
+        self.client.force_login(teacher)
+        response = self.client.get(reverse("lecture_conflicts"))
+        [conflict] = response.context["conflicts"]
+        self.assertEqual(
+            (conflict["first"].pk, conflict["second"].pk), (self.first.pk, mine.pk)
+        )
+        self.assertTrue(conflict["first_hidden"])
+        self.assertTrue(conflict["same_classroom"])
+        self.assertContains(response, "他のコースの予約")
+        self.assertNotContains(response, self.first.name)
+
+
+class AssignmentRecurrenceTests(TestCase):
+    def setUp(self):
+        course = Course.objects.create(name="情報学科")
+        self.user = make_member(course, "taro")
+        # 2026-04-06 は月曜日
+        self.recurrence = AssignmentRecurrence.objects.create(
+            lecture=make_lecture(course=course),
+            owner=self.user,
+            due_time=time(23, 59),
+            starts_on=date(2026, 4, 1),
+            exception_dates=["2026-04-20"],
+        )
+
+    def test_exception_dates_shift_numbering(self):
+        occurrences = occurrences_between(
+            self.recurrence, date(2026, 4, 1), date(2026, 4, 30)
+        )
+        self.assertEqual(
+            [(o.due_date.date(), o.number) for o in occurrences],
+            [
+                (date(2026, 4, 6), 1),
+                (date(2026, 4, 13), 2),
+                (date(2026, 4, 27), 3),
+            ],
+        )
+        self.assertEqual(occurrences[-1].title, "第3回レポート")
+
+    def test_materialize_is_bounded_and_incremental(self):
+        materialize(self.recurrence, date(2026, 4, 14))
+        materialize(self.recurrence, date(2026, 4, 14))
+        self.assertEqual(self.recurrence.occurrences.count(), 2)
+
+        materialize(self.recurrence, date(2026, 5, 1))
+        self.assertEqual(
+            list(
+                self.recurrence.occurrences.order_by("due_date").values_list(
+                    "occurrence_number", flat=True
+                )
+            ),
+            [1, 2, 4],
+        )
+
+    def test_far_future_queries_do_not_write_rows(self):
+        with self.assertNumQueries(0):
+            occurrences = occurrences_between(
+                self.recurrence, date(2030, 1, 1), date(2030, 1, 31)
+            )
+        self.assertEqual(len(occurrences), 4)
+        self.assertFalse(Assignment.objects.exists())
+
+    def test_create_view_materializes_horizon(self):
+        self.client.force_login(self.user)
+        today = timezone.localdate()
+        response = self.client.post(
+            reverse("recurrence_create"),
+            {
+                "lecture": self.recurrence.lecture.pk,
+                "title_template": "第{n}回小テスト",
+                "priority": "medium",
+                "due_time": "12:00",
+                "interval_weeks": 1,
+                "starts_on": today.isoformat(),
+                "exception_dates": "",
+            },
+        )
+        recurrence = AssignmentRecurrence.objects.latest("pk")
+        self.assertRedirects(
+            response, reverse("recurrence_detail", args=[recurrence.pk])
+        )
+        self.assertEqual(recurrence.occurrences.count(), 4)
+
+
+class QueryBudgetTests(TestCase):
+    """全 URL がクエリ予算内に収まること（行数に比例するクエリの検出）"""
+
+    @classmethod
+    def setUpTestData(cls):
+        course = Course.objects.create(name="1年A組")
+        cls.student = make_member(course, "student")
+        cls.teacher = make_member(course, "teacher", role="teacher")
+
+        for i in range(10):
+            lecture = make_lecture(course=course, name=f"講義{i}")
+            for j in range(3):
+                make_assignment(lecture, owner=cls.student, title=f"レポート{i}-{j}")
+        cls.lecture = lecture
+        cls.assignment = lecture.assignments.first()
+        cls.pending = lecture.assignments.last()
+        cls.submission = SubmissionRecord.objects.create(
+            assignment=cls.assignment, submitted_at=timezone.now()
+        )
+        cls.grading = Grading.objects.create(submission=cls.submission, grade=80)
+        cls.recurrence = AssignmentRecurrence.objects.create(
+            lecture=lecture,
+            owner=cls.student,
+            due_time=time(23, 59),
+            starts_on=timezone.localdate(),
+        )
+        materialize(cls.recurrence, timezone.localdate() + timedelta(weeks=4))
+
+        cls.term = Term.objects.create(
+            name="2025年度 後期",
+            starts_on=date(2025, 10, 1),
+            ends_on=date(2026, 2, 28),
+        )
+        for i in range(5):
+            old_lecture = make_lecture(course=course, term=cls.term, name=f"旧講義{i}")
+            make_assignment(old_lecture, owner=cls.student)
+        archive_term(cls.term)
+
+    def url_args(self):
+        return {
+            "index": [],
+            "metrics_trend": [],
+            "service_worker": [],
+            "web_manifest": [],
+            "offline_app": [],
+            "sync": [],
+            "lecture_list": [],
+            "lecture_conflicts": [],
+            "lecture_detail": [self.lecture.pk],
+            "lecture_create": [],
+            "lecture_update": [self.lecture.pk],
+            "lecture_delete": [self.lecture.pk],
+            "assignment_list": [],
+            "assignment_detail": [self.assignment.pk],
+            "assignment_create": [],
+            "assignment_update": [self.assignment.pk],
+            "assignment_delete": [self.assignment.pk],
+            "recurrence_create": [],
+            "recurrence_detail": [self.recurrence.pk],
+            "archive_list": [],
+            "assignment_similar": [],
+            "archive_detail": [self.term.pk],
+            "submission_create": [self.pending.pk],
+            "submission_update": [self.submission.pk],
+            "submission_delete": [self.submission.pk],
+            "grading_create": [self.submission.pk],
+            "grading_update": [self.grading.pk],
+            "grading_delete": [self.grading.pk],
+        }
+
+    def test_every_url_declares_a_budget(self):
+        url_args = self.url_args()
+        for pattern in urlpatterns:
+            with self.subTest(pattern.name):
+                self.assertIn(pattern.name, url_args)
+                self.assertIsNotNone(get_query_budget(pattern.callback))
+
+    @override_settings(QUERY_BUDGET_STRICT=True)
+    def test_pages_stay_within_budget(self):
+        self.client.force_login(self.teacher)
+        for name, args in self.url_args().items():
+            with self.subTest(name):
+                response = self.client.get(reverse(name, args=args))
+                self.assertEqual(response.status_code, 200)
+
+    @override_settings(QUERY_BUDGET_STRICT=True)
+    def test_submission_and_grading_stay_within_budget(self):
+        self.client.force_login(self.student)
+        response = self.client.post(
+            reverse("submission_create", args=[self.pending.pk]),
+            {
+                "assignment": self.pending.pk,
+                "submitted_at": "2026-04-01T10:00",
+                "version": 0,
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+
+        self.client.force_login(self.teacher)
+        response = self.client.post(
+            reverse("grading_create", args=[self.pending.submission.pk]),
+            {"grade": 90, "feedback": "", "version": 0},
+        )
+        self.assertEqual(response.status_code, 302)
+
+    def test_overrun_raises_in_strict_mode_and_warns_otherwise(self):
+        def view(request):
+            list(Lecture.objects.all())
+            list(Assignment.objects.all())
+            return HttpResponse()
+
+        middleware = QueryBudgetMiddleware(view)
+        request = RequestFactory().get("/")
+        middleware.process_view(request, query_budget(1)(view), (), {})
+
+        with override_settings(QUERY_BUDGET_STRICT=True):
+            with self.assertRaises(QueryBudgetExceeded):
+                middleware(request)
+        with self.assertLogs("kojin_kouki_kadai.middleware", "WARNING"):
+            middleware(request)
+
+
+class MetricSnapshotTests(TestCase):
+    def setUp(self):
+        self.course = Course.objects.create(name="1年A組")
+        self.student = make_member(self.course, "student")
+        self.lecture = make_lecture(course=self.course)
+        graded = make_assignment(self.lecture, status="graded", priority="high")
+        make_assignment(self.lecture)
+        make_assignment(make_lecture(course=Course.objects.create(name="1年B組")))
+        submission = SubmissionRecord.objects.create(
+            assignment=graded, submitted_at=timezone.now()
+        )
+        Grading.objects.create(submission=submission, grade=70)
+
+    def test_snapshot_counts_per_course(self):
+        take_snapshot(date(2026, 4, 1))
+        take_snapshot(date(2026, 4, 1))  # 同じ日の再実行は置き換える
+
+        snapshot = MetricSnapshot.objects.get(course=self.course)
+        self.assertEqual(
+            (snapshot.pending_count, snapshot.graded_count, snapshot.high_count),
+            (1, 1, 1),
+        )
+        self.assertEqual(snapshot.lecture_counts, {str(self.lecture.pk): 2})
+        self.assertEqual(snapshot.average_grade, 70)
+        self.assertEqual(MetricSnapshot.objects.count(), 2)
+
+    def test_old_daily_rows_are_downsampled_to_weeks(self):
+        # 2026-01-05（月）〜 2026-01-18（日）の 2 週間分
+        for offset in range(14):
+            take_snapshot(date(2026, 1, 5) + timedelta(days=offset))
+        take_snapshot(date(2026, 4, 20))
+
+        downsample(today=date(2026, 4, 20))
+        rows = MetricSnapshot.objects.filter(course=self.course)
+        self.assertEqual(
+            list(rows.values_list("date", "period")),
+            [
+                (date(2026, 1, 11), "week"),
+                (date(2026, 1, 18), "week"),
+                (date(2026, 4, 20), "day"),
+            ],
+        )
+
+    def test_nightly_downsampling_keeps_one_row_per_week(self):
+        # 2026-01-05（月）〜 2026-03-01（日）の 8 週間、毎晩スナップショットと間引きを行う
+        for offset in range(56):
+            day = date(2026, 1, 5) + timedelta(days=offset)
+            take_snapshot(day)
+            downsample(today=day, retention=timedelta(days=14))
+
+        # 境界（2026-02-15）を含む週より前の 5 週間は週の最終日の 1 行だけが残る
+        rows = MetricSnapshot.objects.filter(course=self.course)
+        self.assertEqual(
+            list(rows.filter(period="week").values_list("date", flat=True)),
+            [date(2026, 1, 11) + timedelta(weeks=week) for week in range(5)],
+        )
+        self.assertEqual(
+            list(rows.filter(period="day").values_list("date", flat=True)),
+            [date(2026, 2, 9) + timedelta(days=offset) for offset in range(21)],
+        )
+
+    def test_trend_reads_only_snapshots(self):
+        take_snapshot(timezone.localdate() - timedelta(days=1))
+        Assignment.objects.all().delete()
+        take_snapshot()
+
+        self.client.force_login(make_member(self.course, "teacher", role="teacher"))
+        trend = self.client.get(
+            reverse("metrics_trend"), {"lecture": self.lecture.pk}
+        ).json()
+        self.assertEqual(trend["pending_count"], [1, 0])
+        self.assertEqual(trend["lecture_count"], [2, 0])
+        self.assertEqual(trend["average_grade"], [70, None])
+
+    def test_students_do_not_see_course_trends(self):
+        take_snapshot()
+        self.client.force_login(self.student)
+        trend = self.client.get(reverse("metrics_trend")).json()
+        self.assertEqual(trend["pending_count"], [])
+        self.assertNotContains(self.client.get(reverse("index")), "trendChart")
+
+    def test_invalid_course_is_rejected(self):
+        self.client.force_login(self.student)
+        response = self.client.get(reverse("metrics_trend"), {"course": "abc"})
+        self.assertEqual(response.status_code, 400)
+
+
+class LectureStatsTests(TestCase):
+    def setUp(self):
+        course = Course.objects.create(name="1年A組")
+        self.student = make_member(course, "student")
+        self.teacher = make_member(course, "teacher", role="teacher")
+        self.lecture = make_lecture(course=course)
+        now = timezone.now()
+        self.next_due = now + timedelta(days=2)
+
+        make_assignment(self.lecture, owner=self.student, due_date=self.next_due)
+        make_assignment(
+            self.lecture, owner=self.student, due_date=now - timedelta(days=1)
+        )
+        graded = make_assignment(self.lecture, owner=self.student, status="graded")
+        submission = SubmissionRecord.objects.create(
+            assignment=graded, submitted_at=now
+        )
+        Grading.objects.create(submission=submission, grade=90)
+        # 学生からは見えない他の学生の課題
+        make_assignment(
+            self.lecture, owner=make_member(course, "classmate"), status="submitted"
+        )
+
+    def test_stats_are_scoped_to_visible_assignments(self):
+        stats = Lecture.objects.with_stats(self.student).get()
+        self.assertEqual(
+            (stats.assignment_count, stats.overdue_count, stats.average_grade),
+            (3, 1, 90),
+        )
+        self.assertAlmostEqual(stats.completion_rate, 100 / 3)
+        self.assertEqual(stats.next_deadline, self.next_due)
+
+        stats = Lecture.objects.with_stats(self.teacher).get()
+        self.assertEqual((stats.assignment_count, stats.completion_rate), (4, 50))
+
+        superuser = User.objects.create_superuser("admin", password="password")
+        self.assertEqual(
+            Lecture.objects.with_stats(superuser).get().assignment_count, 4
+        )
+
+    def test_empty_lecture_has_no_rate(self):
+        lecture = make_lecture(name="線形代数", course=self.lecture.course)
+        stats = Lecture.objects.with_stats(self.teacher).get(pk=lecture.pk)
+        self.assertEqual(stats.assignment_count, 0)
+        self.assertIsNone(stats.completion_rate)
+
+    def test_detail_page_fetches_stats_with_the_lecture(self):
+        self.client.force_login(self.student)
+        # セッション・ユーザー・所属コース・講義と集計・課題一覧
+        with self.assertNumQueries(5):
+            response = self.client.get(
+                reverse("lecture_detail", args=[self.lecture.pk])
+            )
+        self.assertContains(response, "関連課題 (3件)")
+
+
+class SyncTests(TestCase):
+    def setUp(self):
+        course = Course.objects.create(name="1年A組")
+        self.student = make_member(course, "student")
+        classmate = make_member(course, "classmate")
+        lecture = make_lecture(course=course)
+        self.kept = make_assignment(lecture, owner=self.student)
+        self.removed = make_assignment(lecture, owner=self.student)
+        submission = SubmissionRecord.objects.create(
+            assignment=self.removed, submitted_at=timezone.now()
+        )
+        Grading.objects.create(submission=submission, grade=80)
+        self.classmates = make_assignment(lecture, owner=classmate)
+        self.client.force_login(self.student)
+
+    def sync(self, since=None):
+        params = {"since": since} if since else {}
+        return self.client.get(reverse("sync"), params).json()
+
+    def test_first_sync_returns_visible_rows(self):
+        delta = self.sync()
+        self.assertTrue(delta["reset"])
+        self.assertEqual(delta["user_id"], self.student.pk)
+        self.assertEqual(
+            sorted(row["id"] for row in delta["assignments"]),
+            [self.kept.pk, self.removed.pk],
+        )
+        self.assertEqual(len(delta["gradings"]), 1)
+
+    def test_delta_contains_changes_and_tombstones(self):
+        since = self.sync()["since"]
+        self.kept.set_status("submitted")
+        self.removed.delete()
+        self.classmates.delete()
+
+        delta = self.sync(since)
+        self.assertFalse(delta["reset"])
+        self.assertEqual([row["id"] for row in delta["assignments"]], [self.kept.pk])
+        self.assertEqual(
+            sorted(tombstone["model"] for tombstone in delta["deleted"]),
+            ["assignment", "grading", "submissionrecord"],
+        )
+        # カーソルは問い合わせ時刻より前に戻すため、直後の同期では同じ削除が重複して返る
+        self.assertLess(
+            parse_datetime(delta["since"]), timezone.now() - timedelta(seconds=10)
+        )
+        self.assertEqual(len(self.sync(delta["since"])["deleted"]), 3)
+
+    def test_stale_since_forces_full_resync(self):
+        delta = self.sync((timezone.now() - timedelta(days=60)).isoformat())
+        self.assertTrue(delta["reset"])
+        self.assertEqual(len(delta["assignments"]), 2)
+
+
+class TermArchiveTests(TestCase):
+    def setUp(self):
+        self.course = Course.objects.create(name="1年A組")
+        self.student = make_member(self.course, "student")
+        self.term = Term.objects.create(
+            name="2025年度 後期",
+            starts_on=date(2025, 10, 1),
+            ends_on=date(2026, 2, 28),
+        )
+        self.old = make_assignment(
+            make_lecture(course=self.course, term=self.term),
+            owner=self.student,
+            status="graded",
+        )
+        submission = SubmissionRecord.objects.create(
+            assignment=self.old, submitted_at=timezone.now()
+        )
+        Grading.objects.create(submission=submission, grade=75)
+        self.current = make_assignment(
+            make_lecture(course=self.course, name="線形代数"), owner=self.student
+        )
+
+    def test_archived_rows_leave_the_default_managers(self):
+        self.assertEqual(archive_term(self.term), 1)
+
+        self.assertEqual(list(Assignment.objects.all()), [self.current])
+        self.assertEqual(Lecture.objects.count(), 1)
+        self.assertFalse(SubmissionRecord.objects.exists())
+        self.assertFalse(Grading.objects.exists())
+        self.assertEqual(Assignment.all_objects.count(), 2)
+        self.assertEqual(Grading.all_objects.get().grade, 75)
+        # 端末に同期済みの課題・提出記録・採点は削除扱いにする
+        submission = SubmissionRecord.all_objects.get()
+        self.assertEqual(
+            set(SyncTombstone.objects.values_list("model", "object_id", "owner_id")),
+            {
+                ("assignment", self.old.pk, self.student.pk),
+                ("submissionrecord", submission.pk, self.student.pk),
+                ("grading", submission.grading.pk, self.student.pk),
+            },
+        )
+
+    def test_archived_lectures_stop_materializing_recurrences(self):
+        AssignmentRecurrence.objects.create(
+            lecture=self.old.lecture,
+            owner=self.student,
+            due_time=time(23, 59),
+            starts_on=date(2026, 1, 5),
+        )
+        archive_term(self.term)
+        self.assertEqual(materialize_due(today=date(2026, 1, 5)), 0)
+        self.assertFalse(
+            Assignment.all_objects.filter(
+                archived=False, lecture__archived=True
+            ).exists()
+        )
+
+    def test_only_terms_past_the_grace_period_are_archived(self):
+        self.assertEqual(archive_ended_terms(today=date(2026, 3, 15)), {})
+        self.assertEqual(archive_ended_terms(today=date(2026, 4, 1)), {self.term: 1})
+
+    def test_archived_term_is_viewable_on_demand(self):
+        archive_term(self.term)
+        self.client.force_login(self.student)
+
+        response = self.client.get(reverse("assignment_list"))
+        self.assertEqual(list(response.context["assignments"]), [self.current])
+
+        response = self.client.get(reverse("archive_detail", args=[self.term.pk]))
+        self.assertEqual(list(response.context["assignments"]), [self.old])
+        self.assertEqual(response.context["lectures"][0].average_grade, 75)
+        self.assertEqual(
+            self.client.get(
+                reverse("assignment_detail", args=[self.old.pk])
+            ).status_code,
+            404,
+        )
+
+    def test_archive_lists_only_terms_with_visible_lectures(self):
+        other_term = Term.objects.create(
+            name="2025年度 前期",
+            starts_on=date(2025, 4, 1),
+            ends_on=date(2025, 9, 30),
+        )
+        make_lecture(course=Course.objects.create(name="1年B組"), term=other_term)
+        archive_term(self.term)
+        archive_term(other_term)
+        self.client.force_login(self.student)
+
+        response = self.client.get(reverse("archive_list"))
+        self.assertEqual(list(response.context["terms"]), [self.term])
+        response = self.client.get(reverse("archive_detail", args=[other_term.pk]))
+        self.assertEqual(response.status_code, 404)
+
+    @skipUnless(settings.ENABLE_ADMIN, "管理画面が無効")
+    def test_admin_lists_archived_rows(self):
+        archive_term(self.term)
+        request = RequestFactory().get("/")
+        request.user = User.objects.create_superuser("admin")
+        for model in (Lecture, Assignment, SubmissionRecord, Grading):
+            with self.subTest(model=model.__name__):
+                model_admin = admin.site._registry[model]
+                queryset = model_admin.get_queryset(request)
+                self.assertEqual(queryset.count(), model.all_objects.count())
+
+
+class LoadTestReportTests(SimpleTestCase):
+    def test_summary_and_saturation_point(self):
+        samples = [Sample("index", 200, float(ms), True) for ms in range(1, 100)]
+        samples.append(Sample("index", 500, 100.0, False))
+        summary = summarize(samples, elapsed=10)
+        self.assertEqual(summary["throughput"], 10)
+        self.assertEqual((summary["p50"], summary["p99"]), (50, 99))
+        self.assertEqual(summary["error_rate"], 0.01)
+
+        stages = [(1, {"throughput": 40}), (2, {"throughput": 75})]
+        self.assertIsNone(find_saturation(stages))
+        stages += [(4, {"throughput": 77}), (8, {"throughput": 60})]
+        self.assertEqual(find_saturation(stages), 2)
+
+    def test_seed_requires_a_local_database(self):
+        self.assertTrue(is_local_database({"ENGINE": "django.db.backends.sqlite3"}))
+        mysql = {"ENGINE": "django.db.backends.mysql", "HOST": "127.0.0.1"}
+        self.assertTrue(is_local_database(mysql))
+        mysql["HOST"] = "prod.cluster.rds.amazonaws.com"
+        self.assertFalse(is_local_database(mysql))
+
+        # DEBUG=True でもローカル以外の DB には --allow-remote なしで書き込まない
+        with override_settings(DEBUG=True), mock.patch.dict(
+            settings.DATABASES["default"], mysql
+        ):
+            with self.assertRaisesMessage(CommandError, "--allow-remote"):
+                call_command("loadtest", seed=True)
+
+    def test_requests_that_hang_are_recorded_as_errors(self):
+        async def hang(reader, writer):
+            # リクエストを受け取っても応答せず、クライアントが切断するまで待つ
+            await reader.read()
+            writer.close()
+
+        async def request():
+            server = await asyncio.start_server(hang, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            samples = []
+            session = Session(f"http://127.0.0.1:{port}", samples, timeout=0.1)
+            async with server:
+                result = await session.get("index", "/")
+            return result, samples
+
+        (status, _), [sample] = asyncio.run(request())
+        self.assertEqual((status, sample.status, sample.ok), (0, 0, False))
+        self.assertLess(sample.latency, 5000)
+
+    def test_form_fields_include_hidden_inputs(self):
+        fields = parse_form(
+            '<input type="hidden" name="csrfmiddlewaretoken" value="abc">'
+            '<select name="assignment"><option value="1">a</option>'
+            '<option value="2" selected>b</option></select>'
+            '<textarea name="notes">メモ</textarea>'
+            '<input type="hidden" name="version" value="3">'
+        )
+        self.assertEqual(
+            fields,
+            {
+                "csrfmiddlewaretoken": "abc",
+                "assignment": "2",
+                "notes": "メモ",
+                "version": "3",
+            },
+        )
+
+
+class LoadTestStageTests(LiveServerTestCase):
+    def test_stage_replays_the_mix_against_a_live_server(self):
+        course = seed_load_data(students=2, lectures=3, assignments=5)
+        targets = Targets(course)
+        pending = sum(len(s["pending"]) for s in targets.students.values())
+        ungraded = len(targets.ungraded)
+
+        mix = {"assignment_list": 1, "submission": 1, "grading": 1}
+        # テストの SQLite（インメモリ）はライブサーバーのスレッド間で接続を共有するため、
+        # 同時に処理すると他のリクエストのクエリまで数えてしまう。1 接続ずつ送り、
+        # 実際のアクセス比率でもクエリ予算を超えないことを確かめる
+        with self.assertNoLogs("kojin_kouki_kadai.middleware", "WARNING"):
+            samples, elapsed = asyncio.run(
+                run_stage(self.live_server_url, targets, 1, 1.0, mix)
+            )
+
+        self.assertTrue(samples)
+        self.assertEqual(summarize(samples, elapsed)["error_rate"], 0)
+        # 提出・採点の POST（CSRF トークン付き）が実際に保存されている
+        self.assertEqual(
+            SubmissionRecord.objects.count(),
+            Assignment.objects.exclude(status="pending").count(),
+        )
+        self.assertLess(
+            sum(len(s["pending"]) for s in targets.students.values()), pending
+        )
+        self.assertLess(len(targets.ungraded), ungraded)
+
+
+class AssignmentSimilarityTests(TestCase):
+    description = "講義で扱った整列アルゴリズムを実装し、計算量を比較して考察せよ。"
+
+    def setUp(self):
+        self.course = Course.objects.create(name="1年A組")
+        self.teacher = make_member(self.course, "teacher", role="teacher")
+        self.lecture = make_lecture(course=self.course)
+
+    def test_japanese_near_duplicates_score_high(self):
+        original = minhash(normalize("第1回レポート", self.description))
+        copied = minhash(normalize("第１回 レポート", self.description + "（再掲）"))
+        other = minhash(normalize("小テスト", "教科書の練習問題を解いて提出すること。"))
+        self.assertGreaterEqual(similarity(original, copied), 0.7)
+        self.assertLess(similarity(original, other), 0.2)
+
+    def test_signature_is_rebuilt_only_when_text_changes(self):
+        assignment = make_assignment(
+            self.lecture, owner=self.teacher, description=self.description
+        )
+        signature = AssignmentSignature.objects.get(pk=assignment.pk)
+        self.assertEqual(signature.bands.count(), 16)
+
+        assignment.priority = "high"
+        with self.assertNumQueries(2):
+            assignment.save()
+
+        self.client.force_login(self.teacher)
+        self.client.post(
+            reverse("assignment_update", args=[assignment.pk]),
+            {
+                "lecture": self.lecture.pk,
+                "title": "期末レポート",
+                "description": "",
+                "due_date": "2026-12-01 10:00",
+                "priority": "high",
+                "status": "pending",
+                "version": assignment.version,
+            },
+        )
+        self.assertNotEqual(
+            AssignmentSignature.objects.get(pk=assignment.pk).minhash,
+            signature.minhash,
+        )
+
+    def test_create_panel_lists_visible_similar_assignments(self):
+        similar = make_assignment(
+            self.lecture, owner=self.teacher, description=self.description
+        )
+        make_assignment(self.lecture, title="小テスト", owner=self.teacher)
+        hidden = make_assignment(
+            make_lecture(course=Course.objects.create(name="2年B組")),
+            description=self.description,
+        )
+        self.client.force_login(self.teacher)
+
+        self.assertContains(
+            self.client.get(reverse("assignment_create")), "similar-assignments"
+        )
+        response = self.client.get(
+            reverse("assignment_similar"),
+            {"title": "第1回レポート", "description": self.description},
+        )
+        results = response.json()["results"]
+        self.assertEqual([r["id"] for r in results], [similar.pk])
+        self.assertNotIn(hidden.pk, [r["id"] for r in results])
+        self.assertEqual(results[0]["similarity"], 1.0)
+
+    def test_dedupe_report_groups_duplicates(self):
+        first = make_assignment(self.lecture, description=self.description)
+        second = make_assignment(
+            make_lecture(course=self.course, name="アルゴリズム"),
+            description=self.description,
+        )
+        make_assignment(self.lecture, title="小テスト")
+        # bulk_create で作られた行は後からシグネチャを作る
+        (third,) = Assignment.objects.bulk_create(
+            [
+                Assignment(
+                    lecture=self.lecture,
+                    course=self.course,
+                    title="第1回レポート",
+                    description=self.description,
+                    due_date=timezone.now(),
+                )
+            ]
+        )
+        self.assertEqual(build_missing_signatures(Assignment.objects.all()), 1)
+
+        self.assertEqual(
+            duplicate_groups(Assignment.objects.all()),
+            [[first.pk, second.pk, third.pk]],
+        )
+
+    def test_recurrence_occurrences_are_not_reported(self):
+        recurrence = AssignmentRecurrence.objects.create(
+            lecture=self.lecture,
+            owner=self.teacher,
+            title_template="第{n}回レポート",
+            description=self.description,
+            due_time=time(23, 59),
+            starts_on=date(2026, 4, 6),
+        )
+        created = materialize(recurrence, date(2026, 5, 31))
+        # 実体化した回にもシグネチャが作られる
+        self.assertEqual(AssignmentSignature.objects.count(), len(created))
+        self.assertEqual(duplicate_groups(Assignment.objects.all()), [])
+
+    def test_only_the_same_owners_assignments_are_grouped(self):
+        student = make_member(self.course, "student")
+        mine = make_assignment(
+            self.lecture, owner=self.teacher, description=self.description
+        )
+        make_assignment(self.lecture, owner=student, description=self.description)
+        copied = make_assignment(
+            self.lecture, owner=self.teacher, description=self.description
+        )
+        self.assertEqual(
+            duplicate_groups(Assignment.objects.all()), [[mine.pk, copied.pk]]
+        )
+
+    def test_groups_do_not_chain_past_the_threshold(self):
+        # 類似度は a-b 0.92、b-c 0.81、a-c 0.73（閾値 0.8）
+        a, b, c = (
+            make_assignment(self.lecture, owner=self.teacher, description=text)
+            for text in (
+                "講義で扱った整列アルゴリズムを実装し、計算量を比較して考察せよ。"
+                "提出はPDFで行うこと。",
+                "講義で扱った探索アルゴリズムを実装し、計算量を比較して考察せよ。"
+                "提出はPDFで行うこと。",
+                "講義で扱った探索アルゴリズムを実装し、実行時間を比較して考察せよ。"
+                "提出はPDFで行うこと。",
+            )
+        )
+        self.assertEqual(duplicate_groups(Assignment.objects.all()), [[a.pk, b.pk]])
@@ -3,8 +3,19 @@ from . import views
 
 urlpatterns = [
     path("", views.index, name="index"),
+    path("metrics/trend/", views.metrics_trend, name="metrics_trend"),
+    # PWA
+    path("sw.js", views.service_worker, name="service_worker"),
+    path("manifest.webmanifest", views.web_manifest, name="web_manifest"),
+    path("app/", views.offline_app, name="offline_app"),
+    path("sync/", views.sync, name="sync"),
     # Lecture URLs
     path("lectures/", views.LectureListView.as_view(), name="lecture_list"),
+    path(
+        "lectures/conflicts/",
+        views.LectureConflictListView.as_view(),
+        name="lecture_conflicts",
+    ),
     path(
         "lectures/<int:pk>/", views.LectureDetailView.as_view(), name="lecture_detail"
     ),
@@ -21,6 +32,7 @@ urlpatterns = [
     ),
     # Assignment URLs
     path("assignments/", views.AssignmentListView.as_view(), name="assignment_list"),
+    path("assignments/similar/", views.assignment_similar, name="assignment_similar"),
     path(
         "assignments/<int:pk>/",
         views.AssignmentDetailView.as_view(),
@@ -41,6 +53,24 @@ urlpatterns = [
         views.AssignmentDeleteView.as_view(),
         name="assignment_delete",
     ),
+    # AssignmentRecurrence URLs
+    path(
+        "recurrences/new/",
+        views.AssignmentRecurrenceCreateView.as_view(),
+        name="recurrence_create",
+    ),
+    path(
+        "recurrences/<int:pk>/",
+        views.AssignmentRecurrenceDetailView.as_view(),
+        name="recurrence_detail",
+    ),
+    # アーカイブ済みの学期
+    path("archive/", views.ArchivedTermListView.as_view(), name="archive_list"),
+    path(
+        "archive/<int:pk>/",
+        views.ArchivedTermDetailView.as_view(),
+        name="archive_detail",
+    ),
     # SubmissionRecord URLs
     path(
         "assignments/<int:assignment_id>/submission/new/",
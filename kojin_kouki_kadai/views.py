@@ -1,15 +1,116 @@
+import hashlib
+from datetime import timedelta
+
+from django.contrib.auth.decorators import login_required
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.paginator import Paginator
+from django.middleware.csrf import get_token
 from django.shortcuts import render, get_object_or_404, redirect
+from django.templatetags.static import static
+from django.http import HttpResponseRedirect, JsonResponse
+from django.utils.decorators import method_decorator
 from django.views import generic
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 from django.urls import reverse_lazy
 from django.utils import timezone
-from django.db.models import Q
-from .models import Lecture, Assignment, SubmissionRecord, Grading
-from .forms import LectureForm, AssignmentForm, SubmissionRecordForm, GradingForm
+from django.utils.dateparse import parse_datetime
+from django.db.models import Count, F, Max, Q
+from .models import (
+    Lecture,
+    Assignment,
+    AssignmentRecurrence,
+    SubmissionRecord,
+    Grading,
+    ChangeLog,
+    MetricSnapshot,
+    Term,
+    member_course_ids,
+    versioned_update,
+)
+from .forms import (
+    LectureForm,
+    AssignmentForm,
+    AssignmentRecurrenceForm,
+    SubmissionRecordForm,
+    GradingForm,
+)
+from .metrics import trend_series
+from .querybudget import query_budget
+from .recurrence import MATERIALIZE_HORIZON, materialize, occurrences_between
+from .routers import read_from_primary
+from .schedule import find_conflicts
+from .similarity import similar_assignments
+from .sync import changes_since
+
+
+# ===== 条件付き GET（304 応答）=====
+def _listing_state(request):
+    """一覧ページの鮮度判定に使う集計（1 リクエストにつき 1 回だけ計算する）"""
+    if not hasattr(request, "_listing_state"):
+        # 採点の変更は課題の updated_at に現れないため、採点日時も含める
+        assignments = Assignment.objects.visible_to(request.user).aggregate(
+            last=Max("updated_at"),
+            graded=Max("submission__grading__graded_at"),
+            count=Count("id"),
+        )
+        lectures = Lecture.objects.visible_to(request.user).aggregate(
+            last=Max("updated_at"), count=Count("id")
+        )
+        request._listing_state = (assignments, lectures)
+    return request._listing_state
+
+
+def listing_last_modified(request, *args, **kwargs):
+    """課題・講義の max(updated_at)、採点の max(graded_at)"""
+    assignments, lectures = _listing_state(request)
+    timestamps = [
+        t for t in (assignments["last"], assignments["graded"], lectures["last"]) if t
+    ]
+    return max(timestamps) if timestamps else None
+
+
+def listing_etag(request, *args, **kwargs):
+    """max(updated_at) では分からない削除・表示内容の変化も含めた ETag
+
+    件数（削除の検出）、ユーザー、CSRF シークレット（フォームのトークン）、
+    「残り日数」表示のための現在時刻（1 時間単位）を含める。
+    """
+    assignments, lectures = _listing_state(request)
+    # 初回アクセスでもここでシークレットを確定させ、次回の ETag と一致させる
+    get_token(request)
+    state = "|".join(
+        str(part)
+        for part in (
+            request.user.pk,
+            assignments["count"],
+            lectures["count"],
+            listing_last_modified(request),
+            request.META.get("CSRF_COOKIE", ""),
+            timezone.now().strftime("%Y%m%d%H"),
+        )
+    )
+    return hashlib.md5(state.encode(), usedforsecurity=False).hexdigest()
+
+
+def conditional_listing(view_func):
+    """ブラウザのキャッシュを毎回再検証させ、変化がなければビューを実行せず 304 を返す"""
+    view_func = condition(
+        etag_func=listing_etag, last_modified_func=listing_last_modified
+    )(view_func)
+    return cache_control(private=True, no_cache=True)(view_func)
 
 
+@query_budget(24)
+@login_required
+@conditional_listing
 def index(request):
     """ダッシュボード - 課題一覧と統計情報を表示"""
-    all_assignments = Assignment.objects.all().order_by("due_date")
+    all_assignments = (
+        Assignment.objects.visible_to(request.user)
+        .select_related("lecture")
+        .order_by("due_date")
+    )
     pending_assignments = all_assignments.filter(status="pending").order_by("due_date")
     submitted_assignments = all_assignments.filter(status="submitted")
     graded_assignments = all_assignments.filter(status="graded")
@@ -37,12 +138,11 @@ def index(request):
         due_date__gte=timezone.now() + timezone.timedelta(days=14)
     ).count()
 
-    # グラフ用データ：講義別
-    from django.db.models import Count
-
+    # グラフ用データ：講義別（見られる課題だけを数える）
     lectures_data = list(
-        Lecture.objects.annotate(assignment_count=Count("assignments"))
-        .values("name", "assignment_count")
+        all_assignments.order_by()
+        .values("lecture_id", name=F("lecture__name"))
+        .annotate(assignment_count=Count("id"))
         .order_by("-assignment_count")[:5]
     )
 
@@ -62,12 +162,166 @@ def index(request):
         "next_week": next_week,
         "later": later,
         "lectures_data": lectures_data,
+        # 推移はコース全体の集計値のため、担当コースの先生にだけ表示する
+        "show_trend": request.user.is_superuser
+        or bool(member_course_ids(request.user, role="teacher")),
     }
     return render(request, "kojin_kouki_kadai/index.html", context)
 
 
+@query_budget(6)
+@login_required
+def metrics_trend(request):
+    """ダッシュボード指標の推移（JSON）- スナップショットの表だけを読む"""
+    try:
+        days = min(int(request.GET.get("days") or 120), 730)
+    except ValueError:
+        days = 120
+    snapshots = MetricSnapshot.objects.visible_to(request.user).filter(
+        date__gte=timezone.localdate() - timedelta(days=days)
+    )
+
+    # コースフィルタ
+    course = request.GET.get("course")
+    if course:
+        if not course.isdigit():
+            return JsonResponse(
+                {"error": "course には ID を指定してください"}, status=400
+            )
+        snapshots = snapshots.filter(course_id=int(course))
+
+    # 講義フィルタ（講義別の課題数の系列を追加する）
+    lecture = request.GET.get("lecture")
+    lecture_id = int(lecture) if lecture and lecture.isdigit() else None
+
+    return JsonResponse(trend_series(snapshots, lecture_id=lecture_id))
+
+
+# ===== PWA（オフライン表示と差分同期）=====
+def shell_urls():
+    """Service Worker がキャッシュするシェル（ユーザーごとの内容を含まないもの）"""
+    return [
+        reverse_lazy("offline_app"),
+        static("css/style.css"),
+        static("js/offline.js"),
+        "https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css",
+    ]
+
+
+@query_budget(0)
+@cache_control(no_cache=True)
+def service_worker(request):
+    """Service Worker（スコープをサイト全体にするためルートから配信する）"""
+    urls = [str(url) for url in shell_urls()]
+    version = hashlib.md5("|".join(urls).encode(), usedforsecurity=False).hexdigest()
+    return render(
+        request,
+        "kojin_kouki_kadai/sw.js",
+        {"shell_urls": urls, "version": version[:8]},
+        content_type="application/javascript",
+    )
+
+
+@query_budget(0)
+def web_manifest(request):
+    """ホーム画面に追加するための Web App Manifest"""
+    return JsonResponse(
+        {
+            "name": "講義課題管理",
+            "short_name": "課題管理",
+            "start_url": str(reverse_lazy("offline_app")),
+            "display": "standalone",
+            "background_color": "#ffffff",
+            "theme_color": "#2c3e50",
+        },
+        content_type="application/manifest+json",
+        json_dumps_params={"ensure_ascii": False},
+    )
+
+
+@query_budget(0)
+def offline_app(request):
+    """オフラインでも表示できる締切一覧（データは /sync/ から取得して端末に保存する）"""
+    return render(request, "kojin_kouki_kadai/offline_app.html")
+
+
+@query_budget(10)
+@login_required
+def sync(request):
+    """差分同期 - ?since= 以降に変更・削除された課題・提出記録・採点を JSON で返す"""
+    try:
+        since = parse_datetime(request.GET.get("since") or "")
+    except ValueError:
+        since = None
+    if since is not None and timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    # レプリカが遅れていると、カーソルより前の変更を二度と返せなくなる
+    with read_from_primary():
+        changes = changes_since(request.user, since)
+    return JsonResponse(changes)
+
+
+# ===== コース・所有者による絞り込み =====
+class TenantScopedMixin(LoginRequiredMixin):
+    """ログインユーザーが見られる行だけを対象にする Mixin
+
+    ``teacher_only = True`` のビューは担当コースの先生だけが操作できる。
+    """
+
+    teacher_only = False
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.teacher_only:
+            return queryset.taught_by(self.request.user)
+        return queryset.visible_to(self.request.user)
+
+
+class UserFormMixin:
+    """フォームにログインユーザーを渡し、選択肢を絞り込ませる Mixin"""
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs["user"] = self.request.user
+        return kwargs
+
+
+# ===== 楽観的ロック =====
+class OptimisticLockMixin:
+    """version 列による楽観的ロックで更新する UpdateView 用 Mixin
+
+    ``UPDATE ... WHERE id = ? AND version = ?`` の条件付き更新で変更された列だけを書き込み、
+    編集中に他のユーザーが更新していた場合は競合ページを表示する。
+    """
+
+    conflict_template_name = "kojin_kouki_kadai/conflict.html"
+
+    def get_update_values(self, form):
+        """条件付き更新で書き込む列と値"""
+        obj = form.instance
+        return {
+            name: getattr(obj, name) for name in form.changed_data if name != "version"
+        }
+
+    def form_valid(self, form):
+        obj = form.instance
+        values = self.get_update_values(form)
+        if not versioned_update(obj, values, form.cleaned_data["version"]):
+            return self.render_conflict(form)
+
+        self.object = obj
+        return HttpResponseRedirect(self.get_success_url())
+
+    def render_conflict(self, form):
+        current = get_object_or_404(type(form.instance), pk=form.instance.pk)
+        context = {"object": current, "form": form, "edit_url": self.request.path}
+        return render(self.request, self.conflict_template_name, context, status=409)
+
+
 # ===== Lecture CRUD =====
-class LectureListView(generic.ListView):
+@query_budget(8)
+@method_decorator(conditional_listing, name="get")
+class LectureListView(TenantScopedMixin, generic.ListView):
     """講義一覧"""
 
     model = Lecture
@@ -75,22 +329,58 @@ class LectureListView(generic.ListView):
     context_object_name = "lectures"
     ordering = ["day_of_week", "start_time"]
 
+    def get_queryset(self):
+        return super().get_queryset().with_stats(self.request.user)
+
 
-class LectureDetailView(generic.DetailView):
-    """講義詳細 - 関連する課題も表示"""
+@query_budget(10)
+class LectureDetailView(TenantScopedMixin, generic.DetailView):
+    """講義詳細 - 関連する課題と集計（完了率・平均成績など）も表示"""
 
     model = Lecture
     template_name = "kojin_kouki_kadai/lecture_detail.html"
     context_object_name = "lecture"
 
+    def get_queryset(self):
+        # 集計は講義の取得と同じクエリで求める
+        return super().get_queryset().with_stats(self.request.user)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["assignments"] = self.object.assignments.visible_to(
+            self.request.user
+        ).order_by("due_date")
+        return context
+
+
+@query_budget(6)
+class LectureConflictListView(TenantScopedMixin, generic.ListView):
+    """時間割の重複レポート"""
+
+    model = Lecture
+    template_name = "kojin_kouki_kadai/lecture_conflicts.html"
+    context_object_name = "lectures"
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["assignments"] = self.object.assignments.all().order_by("due_date")
+        # 教室の重なりには閲覧できない他のコースの講義も含まれるため、名前を出さない
+        visible = {lecture.pk for lecture in context["lectures"]}
+        context["conflicts"] = [
+            {
+                "first": first,
+                "second": second,
+                "first_hidden": first.pk not in visible,
+                "second_hidden": second.pk not in visible,
+                "same_classroom": first.classroom == second.classroom,
+            }
+            for first, second in find_conflicts(context["lectures"])
+        ]
         return context
 
 
-class LectureCreateView(generic.CreateView):
-    """講義作成"""
+@query_budget(8)
+class LectureCreateView(LoginRequiredMixin, UserFormMixin, generic.CreateView):
+    """講義作成（担当コースの先生用）"""
 
     model = Lecture
     form_class = LectureForm
@@ -98,25 +388,37 @@ class LectureCreateView(generic.CreateView):
     success_url = reverse_lazy("lecture_list")
 
 
-class LectureUpdateView(generic.UpdateView):
-    """講義編集"""
+@query_budget(10)
+class LectureUpdateView(TenantScopedMixin, UserFormMixin, generic.UpdateView):
+    """講義編集（担当コースの先生用）"""
 
     model = Lecture
     form_class = LectureForm
     template_name = "kojin_kouki_kadai/lecture_form.html"
     success_url = reverse_lazy("lecture_list")
+    teacher_only = True
+
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        if "course" in form.changed_data:
+            self.object.sync_assignment_course()
+        return response
 
 
-class LectureDeleteView(generic.DeleteView):
-    """講義削除"""
+@query_budget(8)
+class LectureDeleteView(TenantScopedMixin, generic.DeleteView):
+    """講義削除（担当コースの先生用）"""
 
     model = Lecture
     template_name = "kojin_kouki_kadai/lecture_confirm_delete.html"
     success_url = reverse_lazy("lecture_list")
+    teacher_only = True
 
 
 # ===== Assignment CRUD =====
-class AssignmentListView(generic.ListView):
+@query_budget(10)
+@method_decorator(conditional_listing, name="get")
+class AssignmentListView(TenantScopedMixin, generic.ListView):
     """課題一覧（フィルタリング機能付き）"""
 
     model = Assignment
@@ -126,7 +428,7 @@ class AssignmentListView(generic.ListView):
     paginate_by = 20
 
     def get_queryset(self):
-        queryset = Assignment.objects.all().order_by("due_date")
+        queryset = super().get_queryset().select_related("lecture")
 
         # ステータスフィルタ
         status = self.request.GET.get("status")
@@ -147,13 +449,14 @@ class AssignmentListView(generic.ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["lectures"] = Lecture.objects.all()
+        context["lectures"] = Lecture.objects.visible_to(self.request.user)
         context["status_choices"] = Assignment.STATUS_CHOICES
         context["priority_choices"] = Assignment.PRIORITY_CHOICES
         return context
 
 
-class AssignmentDetailView(generic.DetailView):
+@query_budget(10)
+class AssignmentDetailView(TenantScopedMixin, generic.DetailView):
     """課題詳細"""
 
     model = Assignment
@@ -165,10 +468,22 @@ class AssignmentDetailView(generic.DetailView):
         context["submission"] = (
             self.object.submission if hasattr(self.object, "submission") else None
         )
+
+        # 変更履歴（課題のステータスと採点の変更）
+        history = Q(model="assignment", object_id=self.object.pk)
+        grading = getattr(context["submission"], "grading", None)
+        if grading is not None:
+            history |= Q(model="grading", object_id=grading.pk)
+        paginator = Paginator(ChangeLog.objects.filter(history), 10)
+        context["history_page"] = paginator.get_page(
+            self.request.GET.get("history_page")
+        )
         return context
 
 
-class AssignmentCreateView(generic.CreateView):
+# 保存時のシグネチャとバケットの INSERT（2 件）を含む
+@query_budget(10)
+class AssignmentCreateView(LoginRequiredMixin, UserFormMixin, generic.CreateView):
     """課題作成"""
 
     model = Assignment
@@ -176,8 +491,50 @@ class AssignmentCreateView(generic.CreateView):
     template_name = "kojin_kouki_kadai/assignment_form.html"
     success_url = reverse_lazy("assignment_list")
 
+    def form_valid(self, form):
+        form.instance.owner = self.request.user
+        return super().form_valid(form)
+
+
+@query_budget(8)
+@login_required
+def assignment_similar(request):
+    """作成中の課題と題名・説明が似ている既存の課題（アーカイブ済みを含む）を JSON で返す"""
+    assignments = similar_assignments(
+        Assignment.all_objects.visible_to(request.user),
+        request.GET.get("title", ""),
+        request.GET.get("description", ""),
+    )
+    return JsonResponse(
+        {
+            "results": [
+                {
+                    "id": assignment.pk,
+                    "title": assignment.title,
+                    "lecture": assignment.lecture.name,
+                    "due_date": assignment.due_date,
+                    "archived": assignment.archived,
+                    "similarity": assignment.similarity,
+                    "url": (
+                        None
+                        if assignment.archived
+                        else str(
+                            reverse_lazy("assignment_detail", args=[assignment.pk])
+                        )
+                    ),
+                }
+                for assignment in assignments[:5]
+            ]
+        },
+        json_dumps_params={"ensure_ascii": False},
+    )
+
 
-class AssignmentUpdateView(generic.UpdateView):
+# 題名・説明を変えたときのシグネチャの作り直しを含む
+@query_budget(14)
+class AssignmentUpdateView(
+    TenantScopedMixin, UserFormMixin, OptimisticLockMixin, generic.UpdateView
+):
     """課題編集"""
 
     model = Assignment
@@ -185,8 +542,15 @@ class AssignmentUpdateView(generic.UpdateView):
     template_name = "kojin_kouki_kadai/assignment_form.html"
     success_url = reverse_lazy("assignment_list")
 
+    def get_update_values(self, form):
+        values = super().get_update_values(form)
+        if "lecture" in values:
+            values["course_id"] = values["lecture"].course_id
+        return values
 
-class AssignmentDeleteView(generic.DeleteView):
+
+@query_budget(8)
+class AssignmentDeleteView(TenantScopedMixin, generic.DeleteView):
     """課題削除"""
 
     model = Assignment
@@ -194,8 +558,101 @@ class AssignmentDeleteView(generic.DeleteView):
     success_url = reverse_lazy("assignment_list")
 
 
+# ===== AssignmentRecurrence =====
+@query_budget(13)
+class AssignmentRecurrenceCreateView(
+    LoginRequiredMixin, UserFormMixin, generic.CreateView
+):
+    """繰り返し課題作成 - 作成時に一定期間先までの課題を生成する"""
+
+    model = AssignmentRecurrence
+    form_class = AssignmentRecurrenceForm
+    template_name = "kojin_kouki_kadai/recurrence_form.html"
+
+    def form_valid(self, form):
+        form.instance.owner = self.request.user
+        response = super().form_valid(form)
+        materialize(self.object, timezone.localdate() + MATERIALIZE_HORIZON)
+        return response
+
+    def get_success_url(self):
+        return reverse_lazy("recurrence_detail", kwargs={"pk": self.object.pk})
+
+
+@query_budget(8)
+class AssignmentRecurrenceDetailView(TenantScopedMixin, generic.DetailView):
+    """繰り返し課題詳細 - 生成済みの課題と、その先の予定を表示"""
+
+    model = AssignmentRecurrence
+    template_name = "kojin_kouki_kadai/recurrence_detail.html"
+    context_object_name = "recurrence"
+    upcoming_weeks = 8
+
+    def get_queryset(self):
+        return super().get_queryset().select_related("lecture")
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        recurrence = self.object
+        context["occurrences"] = recurrence.occurrences.order_by("due_date")
+
+        # 生成済みの日付より先の回は DB に書き込まずに計算する
+        if recurrence.materialized_until:
+            start = recurrence.materialized_until + timedelta(days=1)
+        else:
+            start = recurrence.starts_on
+        context["upcoming"] = occurrences_between(
+            recurrence, start, start + timedelta(weeks=self.upcoming_weeks)
+        )
+        return context
+
+
+# ===== アーカイブ済みの学期（閲覧のみ）=====
+class ArchivedTermMixin(LoginRequiredMixin):
+    """アーカイブ済みの学期のうち、ログインユーザーが見られる講義があるものだけを対象にする"""
+
+    def get_queryset(self):
+        lectures = Lecture.all_objects.visible_to(self.request.user)
+        return Term.objects.filter(
+            archived_at__isnull=False, pk__in=lectures.values("term_id")
+        )
+
+
+@query_budget(6)
+class ArchivedTermListView(ArchivedTermMixin, generic.ListView):
+    """アーカイブ済みの学期一覧"""
+
+    template_name = "kojin_kouki_kadai/archive_list.html"
+    context_object_name = "terms"
+
+
+@query_budget(10)
+class ArchivedTermDetailView(ArchivedTermMixin, generic.DetailView):
+    """アーカイブ済みの学期の講義と課題（all_objects から読む）"""
+
+    template_name = "kojin_kouki_kadai/archive_detail.html"
+    context_object_name = "term"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        user = self.request.user
+        context["lectures"] = (
+            Lecture.all_objects.filter(term=self.object)
+            .visible_to(user)
+            .with_stats(user)
+        )
+        context["assignments"] = (
+            Assignment.all_objects.filter(lecture__term=self.object)
+            .visible_to(user)
+            .select_related("lecture")
+            .order_by("lecture__day_of_week", "lecture__start_time", "due_date")
+        )
+        return context
+
+
 # ===== SubmissionRecord CRUD =====
-class SubmissionRecordCreateView(generic.CreateView):
+@query_budget(12)
+class SubmissionRecordCreateView(LoginRequiredMixin, UserFormMixin, generic.CreateView):
     """提出記録作成（課題に紐付ける）"""
 
     model = SubmissionRecord
@@ -205,21 +662,24 @@ class SubmissionRecordCreateView(generic.CreateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         assignment_id = self.kwargs.get("assignment_id")
-        context["assignment"] = get_object_or_404(Assignment, pk=assignment_id)
+        context["assignment"] = get_object_or_404(
+            Assignment.objects.visible_to(self.request.user), pk=assignment_id
+        )
         return context
 
     def get_initial(self):
         initial = super().get_initial()
         assignment_id = self.kwargs.get("assignment_id")
-        initial["assignment"] = get_object_or_404(Assignment, pk=assignment_id)
+        initial["assignment"] = get_object_or_404(
+            Assignment.objects.visible_to(self.request.user), pk=assignment_id
+        )
         initial["submitted_at"] = timezone.now()
         return initial
 
     def form_valid(self, form):
         response = super().form_valid(form)
         # ステータスを「提出済み」に更新
-        self.object.assignment.status = "submitted"
-        self.object.assignment.save()
+        self.object.assignment.set_status("submitted")
         return response
 
     def get_success_url(self):
@@ -228,7 +688,10 @@ class SubmissionRecordCreateView(generic.CreateView):
         )
 
 
-class SubmissionRecordUpdateView(generic.UpdateView):
+@query_budget(12)
+class SubmissionRecordUpdateView(
+    TenantScopedMixin, UserFormMixin, OptimisticLockMixin, generic.UpdateView
+):
     """提出記録編集"""
 
     model = SubmissionRecord
@@ -241,7 +704,8 @@ class SubmissionRecordUpdateView(generic.UpdateView):
         )
 
 
-class SubmissionRecordDeleteView(generic.DeleteView):
+@query_budget(10)
+class SubmissionRecordDeleteView(TenantScopedMixin, generic.DeleteView):
     """提出記録削除"""
 
     model = SubmissionRecord
@@ -254,7 +718,8 @@ class SubmissionRecordDeleteView(generic.DeleteView):
 
 
 # ===== Grading CRUD（先生用）=====
-class GradingCreateView(generic.CreateView):
+@query_budget(12)
+class GradingCreateView(LoginRequiredMixin, generic.CreateView):
     """採点記録作成（先生用）"""
 
     model = Grading
@@ -264,16 +729,19 @@ class GradingCreateView(generic.CreateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         submission_id = self.kwargs.get("submission_id")
-        context["submission"] = get_object_or_404(SubmissionRecord, pk=submission_id)
+        context["submission"] = get_object_or_404(
+            SubmissionRecord.objects.taught_by(self.request.user), pk=submission_id
+        )
         return context
 
     def form_valid(self, form):
         submission_id = self.kwargs.get("submission_id")
-        form.instance.submission = get_object_or_404(SubmissionRecord, pk=submission_id)
+        form.instance.submission = get_object_or_404(
+            SubmissionRecord.objects.taught_by(self.request.user), pk=submission_id
+        )
         response = super().form_valid(form)
         # ステータスを「採点済み」に更新
-        self.object.submission.assignment.status = "graded"
-        self.object.submission.assignment.save()
+        self.object.submission.assignment.set_status("graded")
         return response
 
     def get_success_url(self):
@@ -282,12 +750,14 @@ class GradingCreateView(generic.CreateView):
         )
 
 
-class GradingUpdateView(generic.UpdateView):
+@query_budget(12)
+class GradingUpdateView(TenantScopedMixin, OptimisticLockMixin, generic.UpdateView):
     """採点記録編集（先生用）"""
 
     model = Grading
     form_class = GradingForm
     template_name = "kojin_kouki_kadai/grading_form.html"
+    teacher_only = True
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -300,11 +770,13 @@ class GradingUpdateView(generic.UpdateView):
         )
 
 
-class GradingDeleteView(generic.DeleteView):
+@query_budget(10)
+class GradingDeleteView(TenantScopedMixin, generic.DeleteView):
     """採点記録削除（先生用）"""
 
     model = Grading
     template_name = "kojin_kouki_kadai/grading_confirm_delete.html"
+    teacher_only = True
 
     def get_success_url(self):
         return reverse_lazy(
@@ -0,0 +1,5 @@
+#!/bin/bash
+# デプロイ時に 1 回だけ実行するリリース手順（apprunner.yaml の pre-run で実行する）
+set -e
+export PYTHONPATH=./vendor
+python3 manage.py migrate --noinput